@@ -0,0 +1,142 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Asyncio front-end
+
+import asyncio
+import time
+
+from memoize import MISS
+from problem_1 import LRU_Cache, DEFAULT_CAPACITY
+
+
+class Async_LRU_Cache(object):
+    """
+    Asyncio front-end for LRU_Cache with coalesced loads.
+    Interface:
+        await .get_or_load(address, loader) - Returns the cached value for
+            address. A hit returns without suspending the caller. On a miss
+            loader(address) is awaited in a task, its result stored and
+            returned; callers missing the same address meanwhile await
+            that same task instead of calling loader again. A failed load
+            is not cached and its exception reaches every waiting caller.
+        .get(address) / .set(address, value) - Plain LRU_Cache access.
+        .stats() - Dict with the counters below.
+    Counters:
+        hits, misses (loads started), coalesced (callers that joined a
+        load in flight), load_errors, load_seconds (total) and
+        max_load_seconds.
+    Params:
+        capacity - LRU_Cache capacity. Eviction follows its
+                   delete_least_recent() ordering.
+        cache_params - Any other LRU_Cache argument (max_bytes, sizeof,
+                       default_ttl, ...).
+    Not thread-safe: use it from one event loop.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, **cache_params):
+        self.cache = LRU_Cache(capacity, **cache_params)
+        self.in_flight = {}
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_errors = 0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+
+    def get(self, addr, default=-1):
+        return self.cache.get(addr, default)
+
+    def set(self, addr, value, ttl=None):
+        return self.cache.set(addr, value, ttl)
+
+    async def get_or_load(self, addr, loader):
+        value = self.cache.get(addr, MISS)
+        if value is not MISS: # Cache hit, no suspension point
+            self.hits += 1
+            return value
+        task = self.in_flight.get(addr)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self.load(addr, loader))
+            self.in_flight[addr] = task
+        else:
+            self.coalesced += 1
+        # Shielded: a cancelled caller must not cancel the load the other
+        # callers are waiting for
+        return await asyncio.shield(task)
+
+    # Helper method
+    async def load(self, addr, loader):
+        start = time.perf_counter()
+        try:
+            value = await loader(addr)
+        except BaseException:
+            self.load_errors += 1
+            raise
+        else:
+            self.cache.set(addr, value)
+            return value
+        finally:
+            elapsed = time.perf_counter() - start
+            self.load_seconds += elapsed
+            self.max_load_seconds = max(self.max_load_seconds, elapsed)
+            del self.in_flight[addr]
+
+    def stats(self):
+        loads = self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "load_errors": self.load_errors,
+            "load_seconds": self.load_seconds,
+            "mean_load_seconds": self.load_seconds / loads if loads else 0.0,
+            "max_load_seconds": self.max_load_seconds,
+            "size": self.cache.total_used,
+        }
+
+
+if __name__ == "__main__":
+
+    async def main():
+        backend_calls = []
+
+        async def loader(key):
+            backend_calls.append(key)
+            await asyncio.sleep(0.1)
+            return key * 100
+
+        our_cache = Async_LRU_Cache(2)
+
+        print("\n\n")
+        print("# Test Case 1: Concurrent misses on the same key")
+        values = await asyncio.gather(*[our_cache.get_or_load(1, loader)
+                                        for _ in range(10)])
+        print(values)
+        print("\nBackend calls: {}\n".format(len(backend_calls)))
+        # Expected to see ten 100s from a single backend call.
+
+        print("\n\n")
+        print("# Test Case 2: Hits and eviction")
+        print(await our_cache.get_or_load(1, loader))
+        await our_cache.get_or_load(2, loader)
+        await our_cache.get_or_load(3, loader)
+        print(our_cache.get(1))
+        print(our_cache.stats())
+        # Expected to see 100 (a hit), then -1 since key 1 was the least
+        # recent one when key 3 was loaded.
+
+        print("\n\n")
+        print("# Test Case 3: Failed load")
+
+        async def failing_loader(key):
+            raise KeyError(key)
+
+        results = await asyncio.gather(our_cache.get_or_load(9, failing_loader),
+                                       our_cache.get_or_load(9, failing_loader),
+                                       return_exceptions=True)
+        print(results, our_cache.get(9))
+        # Expected to see the KeyError twice and -1: nothing was cached.
+
+    asyncio.run(main())
@@ -0,0 +1,289 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Benchmarks
+#
+# Usage: python benchmark_1.py [section ...]
+# With no arguments every section is run.
+
+import ast
+import gc
+import inspect
+import itertools
+import os
+import random
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import tracemalloc
+
+import problem_1
+from compact_cache import Compact_LRU_Cache
+from policies import SLRU_Cache, Two_Queue_Cache, W_TinyLFU_Cache
+from problem_1 import LRU_Cache
+from snapshot import load_snapshot, save_snapshot
+from sharded_cache import Locked_LRU_Cache, Sharded_LRU_Cache
+
+
+def bench_threads(thread_counts=(1, 2, 4, 8, 16), ops_per_thread=50000,
+                  capacity=4096, key_space=8192):
+    '''
+    Throughput of a single global lock against a sharded cache as the
+    number of worker threads grows. Each worker runs a read-mostly
+    get/set mix (roughly 90% gets) over a shared key space.
+    '''
+    print("\n# Thread scaling: global lock vs sharded cache")
+    print("ops/thread: {}, capacity: {}, keys: {}".format(
+        ops_per_thread, capacity, key_space))
+    print("{:>8} {:>16} {:>16} {:>8}".format(
+        "threads", "global ops/s", "sharded ops/s", "ratio"))
+
+    def run(cache, threads):
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            keys = [rng.randrange(key_space) for _ in range(ops_per_thread)]
+            barrier.wait()
+            for key in keys:
+                if cache.get(key) == -1:
+                    cache.set(key, key)
+
+        pool = [threading.Thread(target=worker, args=(i,))
+                for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return threads * ops_per_thread / elapsed
+
+    for threads in thread_counts:
+        global_ops = run(Locked_LRU_Cache(capacity), threads)
+        sharded_ops = run(Sharded_LRU_Cache(capacity), threads)
+        print("{:>8} {:>16,.0f} {:>16,.0f} {:>8.2f}".format(
+            threads, global_ops, sharded_ops, sharded_ops / global_ops))
+    # Note: on CPython with the GIL, pure-Python cache operations never run
+    # truly in parallel; sharding removes lock convoys (threads parked on
+    # the same lock across GIL switches) rather than adding CPU parallelism.
+
+
+def bench_memory(entries=1000000):
+    '''
+    Bytes per register (keys and values excluded, they are allocated
+    before measuring) and the duration of a full gc pass over the cache.
+    '''
+    print("\n# Memory per register at {:,} registers".format(entries))
+    print("{:>20} {:>14} {:>14} {:>12}".format(
+        "cache", "bytes/entry", "gc objects", "gc pass ms"))
+    keys = list(range(10 ** 9, 10 ** 9 + entries))
+    for cache_class in (LRU_Cache, Compact_LRU_Cache):
+        gc.collect()
+        objects_before = len(gc.get_objects())
+        tracemalloc.start()
+        cache = cache_class(entries)
+        for key in keys:
+            cache.set(key, key)
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tracked = len(gc.get_objects()) - objects_before
+        start = time.perf_counter()
+        gc.collect()
+        gc_ms = (time.perf_counter() - start) * 1000
+        print("{:>20} {:>14.1f} {:>14,} {:>12.1f}".format(
+            cache_class.__name__, used / entries, tracked, gc_ms))
+        del cache
+
+
+def zipf_trace(length, key_space, alpha=0.9, seed=1):
+    '''Keys drawn from a Zipf(alpha) popularity over key_space keys'''
+    rng = random.Random(seed)
+    weights = [1.0 / (rank ** alpha) for rank in range(1, key_space + 1)]
+    cum_weights = list(itertools.accumulate(weights))
+    keys = list(range(key_space))
+    rng.shuffle(keys) # Popularity must not follow key order
+    return rng.choices(keys, cum_weights=cum_weights, k=length)
+
+
+def scan_mixed_trace(length, key_space, scan_every=20000, scan_length=5000,
+                     alpha=0.9, seed=1):
+    '''Zipf trace interrupted by sequential scans of never seen keys'''
+    trace = zipf_trace(length, key_space, alpha, seed)
+    mixed = []
+    next_scan_key = key_space
+    for start in range(0, length, scan_every):
+        mixed.extend(trace[start:start + scan_every])
+        mixed.extend(range(next_scan_key, next_scan_key + scan_length))
+        next_scan_key += scan_length
+    return mixed
+
+
+def replay_trace(cache, trace):
+    '''Cache-aside replay: get, and set on a miss. Returns hits, seconds'''
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) != -1:
+            hits += 1
+        else:
+            cache.set(key, key)
+    return hits, time.perf_counter() - start
+
+
+def bench_policies(capacity=2000, key_space=50000, length=200000):
+    '''
+    Trace-replay harness: hit ratio and ops/s of every eviction policy
+    on a plain Zipf trace and on a Zipf trace mixed with large scans.
+    '''
+    traces = {
+        "zipf": zipf_trace(length, key_space),
+        "zipf+scans": scan_mixed_trace(length, key_space),
+    }
+    policies = (LRU_Cache, SLRU_Cache, Two_Queue_Cache, W_TinyLFU_Cache)
+    for trace_name, trace in traces.items():
+        print("\n# Policies on '{}' trace: {:,} ops, capacity {:,}, {:,} keys".format(
+            trace_name, len(trace), capacity, key_space))
+        print("{:>18} {:>10} {:>14}".format("policy", "hit ratio", "ops/s"))
+        for policy in policies:
+            hits, seconds = replay_trace(policy(capacity), trace)
+            print("{:>18} {:>10.2%} {:>14,.0f}".format(
+                policy.__name__, hits / len(trace), len(trace) / seconds))
+
+
+def bench_snapshot(entries=1000000):
+    '''
+    Warm-start snapshot of a full cache: save time, file size and restore
+    time against refilling a new cache through set() from the same data.
+    '''
+    print("\n# Snapshot of {:,} registers (int keys, str values)".format(entries))
+    cache = LRU_Cache(entries)
+    for key in range(entries):
+        cache.set(key, "value-{}".format(key))
+    path = os.path.join(tempfile.mkdtemp(), "cache.snapshot")
+
+    start = time.perf_counter()
+    save_snapshot(cache, path)
+    print("save:            {:8.3f} s   {:,.1f} MB".format(
+        time.perf_counter() - start, os.path.getsize(path) / 2 ** 20))
+
+    start = time.perf_counter()
+    restored = load_snapshot(path)
+    print("restore (mmap):  {:8.3f} s".format(time.perf_counter() - start))
+
+    items = [(key, cache.cache_map[key].value) for key in range(entries)]
+    start = time.perf_counter()
+    refilled = LRU_Cache(entries)
+    for key, value in items:
+        refilled.set(key, value)
+    print("refill via set():{:8.3f} s (data already in memory)".format(
+        time.perf_counter() - start))
+    assert restored.total_used == entries
+    assert restored.most_recent_addr == cache.most_recent_addr
+    os.remove(path)
+
+
+# Counters of the instrumentation, left out of the baseline
+STATS_COUNTERS = ("hits", "misses", "inserts", "updates")
+
+
+class Strip_Instrumentation(ast.NodeTransformer):
+    '''
+    Removes from the syntax tree of an LRU_Cache method the statements
+    of the instrumentation: the increments of the STATS_COUNTERS and the
+    "if self.latency is not None" sampling check. Everything else is
+    kept as written.
+    '''
+
+    def __init__(self):
+        self.removed = 0
+
+    def visit_AugAssign(self, node):
+        target = node.target
+        if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) \
+           and target.value.id == "self" and target.attr in STATS_COUNTERS:
+            self.removed += 1
+            return None
+        return node
+
+    def visit_If(self, node):
+        test = node.test
+        if isinstance(test, ast.Compare) and isinstance(test.left, ast.Attribute) \
+           and test.left.attr == "latency":
+            self.removed += 1
+            return None
+        self.generic_visit(node)
+        if not node.body:
+            node.body = [ast.Pass()]
+        return node
+
+
+# Helper function: the method compiled again from its own source without
+# the instrumentation, in the namespace of problem_1
+def uncounted(method):
+    stripper = Strip_Instrumentation()
+    tree = stripper.visit(ast.parse(textwrap.dedent(inspect.getsource(method))))
+    if not stripper.removed: # The baseline would silently equal the real thing
+        raise RuntimeError("No instrumentation found in LRU_Cache.{}".format(method.__name__))
+    namespace = {}
+    exec(compile(ast.fix_missing_locations(tree), inspect.getsourcefile(method), "exec"),
+         vars(problem_1), namespace)
+    return namespace[method.__name__]
+
+
+class Uncounted_LRU_Cache(LRU_Cache):
+    '''
+    LRU_Cache with get()/set()/store_item() stripped of the hit, miss,
+    insert and update counters and of the sampling check. The methods are
+    built from LRU_Cache's own source when this module loads, so the
+    baseline of bench_stats() follows every change to the real class.
+    '''
+
+    get = uncounted(LRU_Cache.get)
+    set = uncounted(LRU_Cache.set)
+    store_item = uncounted(LRU_Cache.store_item)
+
+
+def bench_stats(ops=500000, capacity=4096, key_space=8192):
+    '''
+    Cost of the instrumentation: the same cache-aside get/set mix without
+    it (Uncounted_LRU_Cache), with the counters only (sampling disabled),
+    sampling 1 call in 64 and timing every call. Best of five runs each.
+    '''
+    print("\n# Instrumentation overhead: {:,} ops, capacity {:,}".format(ops, capacity))
+    print("{:>22} {:>14} {:>10}".format("mode", "ops/s", "overhead"))
+    rng = random.Random(1)
+    trace = [rng.randrange(key_space) for _ in range(ops)]
+    baseline = None
+    for mode, cache_class, sample_every in (("no instrumentation", Uncounted_LRU_Cache, None),
+                                            ("counters only", LRU_Cache, None),
+                                            ("sampled 1/64", LRU_Cache, 64),
+                                            ("sampled 1/1", LRU_Cache, 1)):
+        rate = 0
+        for _ in range(5):
+            cache = cache_class(capacity)
+            if sample_every is not None:
+                cache.enable_latency_sampling(sample_every)
+            _, seconds = replay_trace(cache, trace)
+            rate = max(rate, ops / seconds)
+        if baseline is None:
+            baseline = rate
+        print("{:>22} {:>14,.0f} {:>9.1%}".format(mode, rate, baseline / rate - 1))
+    print("get latency (1/1): {}".format(cache.stats()["get_latency"]))
+
+
+SECTIONS = {
+    "threads": bench_threads,
+    "memory": bench_memory,
+    "policies": bench_policies,
+    "snapshot": bench_snapshot,
+    "stats": bench_stats,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(SECTIONS)
+    for name in selected:
+        SECTIONS[name]()
@@ -0,0 +1,140 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Memoization decorator
+
+import functools
+import threading
+
+from problem_1 import LRU_Cache, DEFAULT_CAPACITY
+
+# Unique miss sentinel: any value, -1 included, can be cached
+MISS = object()
+# Separates positional from keyword arguments in a cache key
+KWARGS_MARK = object()
+
+
+# Helper function: builds a hashable cache key from the call arguments.
+# A lone int or str argument is its own key (cheaper to hash than a tuple
+# and unable to collide with the tuple of a multi-argument call).
+def make_key(args, kwargs):
+    if not kwargs:
+        if len(args) == 1 and type(args[0]) in (int, str):
+            return args[0]
+        return args
+    return args + (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class In_Flight_Call(object):
+    """
+    A computation started by the first caller missing a key. Callers
+    missing the same key meanwhile wait for it instead of recomputing.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def memoize(capacity=DEFAULT_CAPACITY, **cache_params):
+    """
+    Decorator memoizing a function through a LRU_Cache.
+    Results are keyed by the call arguments (which must be hashable).
+    When several threads miss the same key at once only the first one
+    calls the function (single-flight); the others wait and share its
+    result, or its exception.
+    Params:
+        capacity - LRU_Cache capacity.
+        cache_params - Any other LRU_Cache argument (max_bytes, sizeof,
+                       default_ttl, ...).
+    The decorated function exposes:
+        .cache - The underlying LRU_Cache.
+        .cache_info() - Dict with hits, misses and coalesced counters.
+    """
+
+    def decorator(function):
+        cache = LRU_Cache(capacity, **cache_params)
+        lock = threading.Lock()
+        in_flight = {}
+        info = {"hits": 0, "misses": 0, "coalesced": 0}
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            with lock:
+                value = cache.get(key, MISS)
+                if value is not MISS: # Cache hit
+                    info["hits"] += 1
+                    return value
+                call = in_flight.get(key)
+                if call is None: # This thread computes the value
+                    info["misses"] += 1
+                    call = in_flight[key] = In_Flight_Call()
+                    leader = True
+                else: # Someone else is already computing it
+                    info["coalesced"] += 1
+                    leader = False
+
+            if not leader:
+                call.done.wait()
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                call.result = function(*args, **kwargs)
+            except BaseException as error:
+                call.error = error
+                raise
+            else:
+                with lock:
+                    cache.set(key, call.result)
+                return call.result
+            finally:
+                with lock:
+                    del in_flight[key]
+                call.done.set()
+
+        def cache_info():
+            with lock:
+                return dict(info)
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\n\n")
+    print("# Test Case 1: Memoized function returning -1")
+    calls = []
+
+    @memoize(capacity=4)
+    def sign(number):
+        calls.append(number)
+        return -1 if number < 0 else 1
+
+    print(sign(-5), sign(-5), sign(3))
+    print("\nFunction calls: {}, {}\n".format(len(calls), sign.cache_info()))
+    # Expected to see -1 -1 1 and only 2 function calls: a cached -1 is a hit.
+
+    print("\n\n")
+    print("# Test Case 2: Concurrent misses on the same key")
+    calls = []
+
+    @memoize(capacity=4)
+    def slow_square(number):
+        calls.append(number)
+        time.sleep(0.2)
+        return number * number
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        print(list(pool.map(slow_square, [7] * 8)))
+    print("\nFunction calls: {}, {}\n".format(len(calls), slow_square.cache_info()))
+    # Expected to see eight 49s computed by a single function call.
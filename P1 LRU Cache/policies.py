@@ -0,0 +1,323 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Scan-resistant policies
+
+from problem_1 import LRU_Cache, DEFAULT_CAPACITY
+
+# Script Params
+SLRU_PROTECTED_RATIO = 0.8 # Share of SLRU capacity for the protected segment
+TWO_QUEUE_IN_RATIO = 0.25 # Share of 2Q capacity for the A1in FIFO
+TWO_QUEUE_OUT_RATIO = 0.5 # Ghost keys remembered by 2Q, relative to capacity
+TINY_LFU_WINDOW_RATIO = 0.01 # Share of W-TinyLFU capacity for the window LRU
+SKETCH_DEPTH = 4 # Rows of the count-min sketch
+SKETCH_MAX_COUNT = 15 # Counters saturate here (4-bit counters in TinyLFU)
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_64 = 0x9E3779B97F4A7C15
+SKETCH_SEEDS = [(GOLDEN_64 * (row + 1)) & MASK_64 for row in range(SKETCH_DEPTH)]
+# Byte translation table halving every counter at once
+HALVE_TABLE = bytes(count >> 1 for count in range(256))
+
+
+# Helper function: removes the least recent register of a LRU_Cache segment
+# and hands it back, so it can move to another segment
+def pop_least_recent(segment):
+    key = segment.least_recent_addr
+    value = segment.cache_map[key].value
+    segment.delete_item(key)
+    return key, value
+
+
+# Helper function: splits a capacity in two segments with at least one
+# register each
+def split_capacity(capacity, ratio):
+    first = min(max(1, int(capacity * ratio)), capacity - 1)
+    return first, capacity - first
+
+
+class SLRU_Cache(object):
+    """
+    Segmented LRU cache.
+    New registers enter a probationary LRU segment and only move to the
+    protected LRU segment when they are accessed again. A one-time scan
+    therefore churns the probationary segment and leaves the protected
+    working set alone. Registers falling out of the protected segment
+    get a second chance at the head of the probationary one.
+    The protected segment is capped at protected_ratio of the capacity;
+    the probationary one may use whatever the protected one leaves free.
+    Interface:
+        Same .get(address) / .set(address, value) contract as LRU_Cache.
+    Params:
+        capacity - Total cache lenght. Invalid numbers (less than two
+                   registers) assume the DEFAULT_CAPACITY param.
+        protected_ratio - Share of capacity for the protected segment.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY,
+                 protected_ratio=SLRU_PROTECTED_RATIO):
+
+        # Size consistency
+        if capacity < 2:
+            capacity = DEFAULT_CAPACITY
+
+        self.capacity = capacity
+        protected, _ = split_capacity(capacity, protected_ratio)
+        self.protected = LRU_Cache(protected)
+        self.probation = LRU_Cache(capacity)
+
+    def get(self, addr):
+        if addr in self.protected.cache_map:
+            return self.protected.get(addr)
+        if addr in self.probation.cache_map:
+            value = self.probation.cache_map[addr].value
+            self.promote(addr, value)
+            return value
+        return -1
+
+    def set(self, addr, value):
+        if addr in self.protected.cache_map:
+            self.protected.set(addr, value)
+        elif addr in self.probation.cache_map:
+            self.promote(addr, value)
+        else:
+            if len(self) >= self.capacity:
+                if self.probation.total_used:
+                    self.probation.delete_least_recent()
+                else:
+                    self.protected.delete_least_recent()
+            self.probation.set(addr, value)
+
+    def __contains__(self, addr):
+        return addr in self.protected.cache_map or addr in self.probation.cache_map
+
+    def __len__(self):
+        return self.protected.total_used + self.probation.total_used
+
+    def victim(self):
+        # Next register to be evicted
+        if self.probation.total_used:
+            return self.probation.least_recent_addr
+        return self.protected.least_recent_addr
+
+    def delete(self, addr):
+        if addr in self.protected.cache_map:
+            self.protected.delete_item(addr)
+        elif addr in self.probation.cache_map:
+            self.probation.delete_item(addr)
+
+    # Helper method
+    def promote(self, key, value):
+        self.probation.delete_item(key)
+        if self.protected.total_used >= self.protected.capacity:
+            # Demotes the least recent protected register; there is room
+            # for it since the promoted one just left the probation segment
+            demoted_key, demoted_value = pop_least_recent(self.protected)
+            self.probation.set(demoted_key, demoted_value)
+        self.protected.set(key, value)
+
+
+class Two_Queue_Cache(object):
+    """
+    2Q cache (Johnson & Shasha, full version).
+    A1in - FIFO holding registers seen once.
+    A1out - FIFO of ghost keys (no values) recently dropped from A1in.
+    Am - LRU holding registers seen again while remembered in A1out.
+    A scan only cycles A1in and A1out, so the hot registers in Am stay.
+    Interface:
+        Same .get(address) / .set(address, value) contract as LRU_Cache.
+    Params:
+        capacity - Total cache lenght (A1in plus Am). Invalid numbers (less
+                   than two registers) assume the DEFAULT_CAPACITY param.
+        in_ratio - Share of capacity for A1in.
+        out_ratio - Ghost keys kept in A1out, relative to capacity.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, in_ratio=TWO_QUEUE_IN_RATIO,
+                 out_ratio=TWO_QUEUE_OUT_RATIO):
+
+        # Size consistency
+        if capacity < 2:
+            capacity = DEFAULT_CAPACITY
+
+        self.capacity = capacity
+        a1in, am = split_capacity(capacity, in_ratio)
+        # A1in and A1out are read straight from cache_map, never through
+        # get(), so their recency order stays the insertion (FIFO) order
+        self.a1in = LRU_Cache(a1in)
+        self.a1out = LRU_Cache(max(1, int(capacity * out_ratio)))
+        self.am = LRU_Cache(am)
+
+    def get(self, addr):
+        if addr in self.am.cache_map:
+            return self.am.get(addr)
+        if addr in self.a1in.cache_map:
+            return self.a1in.cache_map[addr].value
+        return -1
+
+    def set(self, addr, value):
+        if addr in self.am.cache_map:
+            self.am.set(addr, value)
+        elif addr in self.a1in.cache_map:
+            self.a1in.cache_map[addr].value = value
+        elif addr in self.a1out.cache_map:
+            # Seen again shortly after leaving A1in: it is a hot register
+            self.a1out.delete_item(addr)
+            self.am.set(addr, value)
+        else:
+            if self.a1in.total_used >= self.a1in.capacity:
+                old_key, _ = pop_least_recent(self.a1in)
+                self.a1out.set(old_key, None)
+            self.a1in.set(addr, value)
+
+    def __len__(self):
+        return self.a1in.total_used + self.am.total_used
+
+
+class Count_Min_Sketch(object):
+    """
+    Count-min sketch of access frequencies with periodic aging.
+    Each key increments one saturating 4-bit style counter in each of the
+    four rows and the estimate is the minimum of its counters. After
+    sample_size increments every counter is halved, so old popularity
+    fades out. The four rows are unrolled since the sketch is touched on
+    every cache access.
+    Params:
+        width - Counters per row, rounded up to a power of two.
+        sample_size - Increments between two agings. Defaults to 10x width.
+    """
+
+    def __init__(self, width, sample_size=None):
+        self.bits = max(1, (width - 1).bit_length())
+        self.width = 1 << self.bits
+        self.shift = 64 - self.bits
+        self.rows = [bytearray(self.width) for _ in range(SKETCH_DEPTH)]
+        self.sample_size = sample_size if sample_size else 10 * self.width
+        self.additions = 0
+
+    # Helper method: one counter position per row (multiplicative hashing,
+    # the top bits of the product of a seeded key hash)
+    def indexes(self, key):
+        h = hash(key) & MASK_64
+        shift = self.shift
+        return ((((h ^ SKETCH_SEEDS[0]) * GOLDEN_64) & MASK_64) >> shift,
+                (((h ^ SKETCH_SEEDS[1]) * GOLDEN_64) & MASK_64) >> shift,
+                (((h ^ SKETCH_SEEDS[2]) * GOLDEN_64) & MASK_64) >> shift,
+                (((h ^ SKETCH_SEEDS[3]) * GOLDEN_64) & MASK_64) >> shift)
+
+    def increment(self, key):
+        a, b, c, d = self.indexes(key)
+        row_a, row_b, row_c, row_d = self.rows
+        if row_a[a] < SKETCH_MAX_COUNT:
+            row_a[a] += 1
+        if row_b[b] < SKETCH_MAX_COUNT:
+            row_b[b] += 1
+        if row_c[c] < SKETCH_MAX_COUNT:
+            row_c[c] += 1
+        if row_d[d] < SKETCH_MAX_COUNT:
+            row_d[d] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def estimate(self, key):
+        a, b, c, d = self.indexes(key)
+        row_a, row_b, row_c, row_d = self.rows
+        return min(row_a[a], row_b[b], row_c[c], row_d[d])
+
+    def age(self):
+        self.rows = [row.translate(HALVE_TABLE) for row in self.rows]
+        self.additions //= 2
+
+
+class W_TinyLFU_Cache(object):
+    """
+    Window TinyLFU cache (Einziger, Friedman & Manes).
+    New registers enter a small window LRU. A register pushed out of the
+    window is only admitted into the main SLRU if the frequency sketch
+    says it is accessed more often than the register the main SLRU
+    would evict. Scans and one-hit wonders lose that duel and never
+    displace the frequently used registers.
+    Interface:
+        Same .get(address) / .set(address, value) contract as LRU_Cache.
+        Every get() and set() counts as one access in the sketch.
+    Params:
+        capacity - Total cache lenght. Invalid numbers (less than three
+                   registers) assume the DEFAULT_CAPACITY param.
+        window_ratio - Share of capacity for the window LRU.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY,
+                 window_ratio=TINY_LFU_WINDOW_RATIO):
+
+        # Size consistency
+        if capacity < 3:
+            capacity = DEFAULT_CAPACITY
+
+        self.capacity = capacity
+        window, main = split_capacity(capacity, window_ratio)
+        self.window = LRU_Cache(window)
+        self.main = SLRU_Cache(main)
+        self.sketch = Count_Min_Sketch(capacity)
+        # Counters
+        self.admitted = 0
+        self.rejected = 0
+
+    def get(self, addr):
+        self.sketch.increment(addr)
+        if addr in self.window.cache_map:
+            return self.window.get(addr)
+        return self.main.get(addr)
+
+    def set(self, addr, value):
+        self.sketch.increment(addr)
+        if addr in self.window.cache_map:
+            self.window.set(addr, value)
+        elif addr in self.main:
+            self.main.set(addr, value)
+        else:
+            if self.window.total_used >= self.window.capacity:
+                self.admit(*pop_least_recent(self.window))
+            self.window.set(addr, value)
+
+    def __len__(self):
+        return self.window.total_used + len(self.main)
+
+    # Helper method: the window candidate duels the main cache victim
+    def admit(self, key, value):
+        if len(self.main) < self.main.capacity:
+            self.main.set(key, value)
+            return
+        victim = self.main.victim()
+        if self.sketch.estimate(key) > self.sketch.estimate(victim):
+            self.main.delete(victim)
+            self.main.set(key, value)
+            self.admitted += 1
+        else:
+            self.rejected += 1
+
+
+if __name__ == "__main__":
+
+    def replay(cache, trace):
+        hits = 0
+        for key in trace:
+            if cache.get(key) != -1:
+                hits += 1
+            else:
+                cache.set(key, key)
+        return hits
+
+    hot_keys = [key for key in range(16) for _ in range(2)] * 10
+    scan = list(range(1000, 1300))
+
+    for cache_class in (LRU_Cache, SLRU_Cache, Two_Queue_Cache, W_TinyLFU_Cache):
+        print("\n\n")
+        print("# Test Case: Hot keys, a long scan, then the hot keys again - {}".format(
+            cache_class.__name__))
+        our_cache = cache_class(32)
+        replay(our_cache, hot_keys)
+        replay(our_cache, scan)
+        print("Hot keys hit after the scan: {} of 16".format(replay(our_cache, range(16))))
+        # Expected to see 0 for LRU_Cache (the scan flushed it). SLRU and
+        # W-TinyLFU keep all or almost all the hot keys; 2Q keeps the ones
+        # that reached Am (those re-referenced after leaving A1in).
@@ -2,20 +2,74 @@
 # Part 2 - Data Structures
 # Project 2 - Problem #1 - LRU Cache
 
+import sys
+import time
+
 # Script Params
-MAX_CAPACITY = 1024
 DEFAULT_CAPACITY = 64
+DEFAULT_PURGE_BATCH = 8
+DEFAULT_SAMPLE_EVERY = 64 # One get/set latency measured out of this many
+LATENCY_BUCKETS = 64 # Power of two nanosecond buckets: [2^(i-1), 2^i)
 
 class MAP_Node:
     """
     Helper class for LRU Cache. 
-    It defines the 'value' structure of each register entry
+    It defines the 'value' structure of each register entry.
+    Slotted (no per-instance __dict__) so each register costs a fixed
+    72 bytes object on 64-bit CPython.
     """
-    
-    def __init__(self, value):
+
+    __slots__ = ("value", "next", "previous", "size", "expires")
+
+    def __init__(self, value, size=0, expires=None):
         self.value = value # Actual value stored in cache
         self.next = None # Key reference to the next newer register
         self.previous = None # Key reference to the previous older register
+        self.size = size # Bytes charged to the budget (byte-budget mode)
+        self.expires = expires # Clock time when it gets stale (None: never)
+
+
+class Latency_Histogram:
+    """
+    Helper class for LRU Cache instrumentation.
+    Log-scale latency histogram: bucket i counts samples of 2^(i-1) up to
+    2^i - 1 nanoseconds, so recording is one bit_length() and one add.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * LATENCY_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.buckets[min(ns.bit_length(), LATENCY_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the given fraction of samples
+        if self.count == 0:
+            return 0
+        threshold = fraction * self.count
+        seen = 0
+        for bucket, samples in enumerate(self.buckets):
+            seen += samples
+            if seen >= threshold:
+                return (1 << bucket) - 1
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "samples": self.count,
+            "mean_ns": self.total_ns / self.count if self.count else 0,
+            "p50_ns": self.percentile(0.5),
+            "p90_ns": self.percentile(0.9),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": self.max_ns,
+        }
 
 
 class LRU_Cache(object):
@@ -24,24 +78,76 @@ class LRU_Cache(object):
     At the limit of a giving cache memory capacity the least
     recently used data gives space the newer ones.
     Interface:
-        .get(address) - Returns the data value for a giving address 
-                        or -1 if the data is not found.
-        .set(address, value) - Uptades the value for a giving address 
-                               or includes a new record if not present.
+        .get(address, default=-1) - Returns the data value for a giving
+                        address or default if the data is not found or
+                        expired. Pass a unique object as default to tell
+                        a miss apart from a cached -1.
+        .get_many(addresses, default=-1) - List of .get() results.
+        .set(address, value, ttl=None) - Uptades the value for a giving
+                               address or includes a new record if not
+                               present. An optional time-to-live in seconds
+                               overrides default_ttl for this register.
+                               Returns False if the value was rejected.
+        .set_many(items, ttl=None) - .set() for every (address, value)
+                               pair or mapping item. Returns how many
+                               values were stored.
+        .purge_expired(limit) - Checks at most limit registers from the
+                                least recent end and removes the expired
+                                ones. Returns how many were removed.
+        .stats() - Dict snapshot of the counters (and latency histogram
+                   summaries when sampling), cheap enough to poll.
+        .enable_latency_sampling(sample_every) - Times one get()/set()
+                   call out of sample_every into Latency_Histograms.
+        .disable_latency_sampling() - Stops timing calls.
     Params:
         capacity - Cache lenght. Optional argument. Expected type <int> 
                    If received an invalid number or not provided it will 
-                   assume the DEFAULT_CAPACITY param.   
-                   The capacity also cannot exceed MAX_CAPACITY param.
+                   assume the DEFAULT_CAPACITY param.
+                   There is no upper limit; see compact_cache.py for a
+                   denser layout when holding millions of registers.
+        max_bytes - Byte budget. Optional argument. Expected type <int>
+                    When given, least recent registers are also evicted
+                    until the stored values fit the budget, and a value
+                    bigger than the whole budget is rejected.
+        sizeof - Callable giving the size in bytes of a value. Optional
+                 argument, only used with max_bytes. Defaults to
+                 sys.getsizeof (shallow size of the value object).
+        default_ttl - Time-to-live in seconds for registers set without
+                      their own ttl. Optional argument, None never expires.
+        purge_batch - When greater than zero every set() also runs
+                      purge_expired(purge_batch), reclaiming stale
+                      registers a few at a time. Optional argument.
+        clock - Callable returning the current time in seconds. Optional
+                argument. Defaults to time.monotonic.
+    Counters:
+        hits, misses - get() results (an expired register is a miss).
+        inserts, updates - set() results on new and present registers.
+        total_bytes - Bytes currently charged to the budget.
+        evictions - Registers removed to make room (capacity or bytes).
+        rejections - Values refused for exceeding max_bytes on their own.
+        expirations - Stale registers removed by get() or purge_expired().
+    Instrumentation cost:
+        Against get()/set() without counters, on a cache-aside mix: about
+        7-12% for the counters, 15-20% sampling 1 call in 64 and about
+        150% timing every call (single core CPython 3.11, noisy).
+        Measured by benchmark_1.py "stats" section.
+    Memory:
+        About 115 bytes per register on 64-bit CPython 3.11 (72 bytes
+        slotted MAP_Node plus its cache_map slot), not counting the key
+        and value objects. Without __slots__ it was about 140 bytes.
+        Measured by benchmark_1.py "memory" section.
     """
     
-    def __init__(self, capacity=DEFAULT_CAPACITY):
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_bytes=None, sizeof=None,
+                 default_ttl=None, purge_batch=0, clock=None):
 
         # Size consistency
         if capacity <= 0:
             capacity = DEFAULT_CAPACITY
-        elif capacity > MAX_CAPACITY:
-            capacity = MAX_CAPACITY
+        if max_bytes is not None and max_bytes <= 0:
+            max_bytes = None
+        if default_ttl is not None and default_ttl <= 0:
+            default_ttl = None
 
         # Initialize the LRU structure
         self.capacity = capacity
@@ -53,24 +159,222 @@ class LRU_Cache(object):
         self.most_recent_addr = None
         # and tail end (least recently accessed register)
         self.least_recent_addr = None
-
-
-    def get(self, addr):
+        # Byte budget structure
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof if sizeof is not None else sys.getsizeof
+        self.total_bytes = 0
+        # Expiry structure
+        self.default_ttl = default_ttl
+        self.purge_batch = purge_batch
+        self.clock = clock if clock is not None else time.monotonic
+        # Key where the next purge_expired() walk resumes
+        self.purge_cursor = None
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.updates = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+        # Latency histograms, only while sampling is enabled
+        self.latency = None
+        self.sample_every = DEFAULT_SAMPLE_EVERY
+        self.get_countdown = self.set_countdown = DEFAULT_SAMPLE_EVERY
+
+
+    def get(self, addr, default=-1):
+        if self.latency is not None: # Sampling: is this call the 1 in N?
+            self.get_countdown -= 1
+            if not self.get_countdown:
+                return self.timed_get(addr, default)
         if addr in self.cache_map: # Cache hit
+            node = self.cache_map[addr]
+            if node.expires is not None and node.expires <= self.clock():
+                # Stale register, unlinked right away and seen as a miss
+                self.delete_item(addr)
+                self.expirations += 1
+                self.misses += 1
+                return default
             self.update_most_recent(addr)
-            return self.cache_map[addr].value
+            self.hits += 1
+            return node.value
         else: # Cache miss
-            return -1
-    
+            self.misses += 1
+            return default
+
+
+    def get_many(self, addrs, default=-1):
+        # Same as get() for every address, with the attribute lookups and
+        # the clock reading done once for the whole batch
+        cache_map = self.cache_map
+        update_most_recent = self.update_most_recent
+        now = None
+        values = []
+        misses = 0
+        for addr in addrs:
+            node = cache_map.get(addr)
+            if node is None: # Cache miss
+                values.append(default)
+                misses += 1
+                continue
+            if node.expires is not None:
+                if now is None:
+                    now = self.clock()
+                if node.expires <= now: # Stale register
+                    self.delete_item(addr)
+                    self.expirations += 1
+                    values.append(default)
+                    misses += 1
+                    continue
+            update_most_recent(addr)
+            values.append(node.value)
+        self.misses += misses
+        self.hits += len(values) - misses
+        return values
+
+
+    def set(self, addr, value, ttl=None):
+        if self.latency is not None: # Sampling: is this call the 1 in N?
+            self.set_countdown -= 1
+            if not self.set_countdown:
+                return self.timed_set(addr, value, ttl)
+        if self.purge_batch > 0:
+            self.purge_expired(self.purge_batch)
+        if ttl is None:
+            ttl = self.default_ttl
+        expires = self.clock() + ttl if ttl is not None else None
+        return self.store_item(addr, value, expires)
+
+
+    def set_many(self, items, ttl=None):
+        # Same as set() for every (address, value) pair or mapping item,
+        # with one purge step and one clock reading for the whole batch.
+        # Returns how many values were stored (not rejected).
+        if self.purge_batch > 0:
+            self.purge_expired(self.purge_batch)
+        if ttl is None:
+            ttl = self.default_ttl
+        expires = self.clock() + ttl if ttl is not None else None
+        if hasattr(items, "items"):
+            items = items.items()
+        store_item = self.store_item
+        stored = 0
+        for addr, value in items:
+            if store_item(addr, value, expires):
+                stored += 1
+        return stored
 
-    def set(self, addr, value):
+
+    # Helper method
+    def store_item(self, addr, value, expires):
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes: # It would never fit
+                # An older value must not survive a rejected update
+                if addr in self.cache_map:
+                    self.delete_item(addr)
+                self.rejections += 1
+                return False
         if addr in self.cache_map: # Cache hit
-            self.cache_map[addr].value = value
+            node = self.cache_map[addr]
+            self.total_bytes += size - node.size
+            node.value = value
+            node.size = size
+            node.expires = expires
             self.update_most_recent(addr)
+            self.updates += 1
+            # The updated register is now the most recent one, so it is
+            # the last candidate in line while making room
+            if self.max_bytes is not None:
+                while self.total_bytes > self.max_bytes:
+                    self.delete_least_recent()
         else: # Cache miss
             if self.total_used >= self.capacity:
                 self.delete_least_recent()
-            self.insert_new_item(addr, value)
+            if self.max_bytes is not None:
+                while self.total_bytes + size > self.max_bytes:
+                    self.delete_least_recent()
+            self.insert_new_item(addr, value, size, expires)
+            self.inserts += 1
+        return True
+
+
+    def purge_expired(self, limit=DEFAULT_PURGE_BATCH):
+        # Bounded walk from the tail end: the work per call never depends
+        # on the cache size, so it is safe to run on the hot path.
+        # The walk resumes where the previous call stopped, so fresh
+        # registers near the tail are not checked over and over again.
+        removed = 0
+        now = self.clock()
+        key = self.purge_cursor
+        if key not in self.cache_map:
+            key = self.least_recent_addr
+        for _ in range(limit):
+            if key is None:
+                break
+            node = self.cache_map[key]
+            next_key = node.next
+            if node.expires is not None and node.expires <= now:
+                self.delete_item(key)
+                self.expirations += 1
+                removed += 1
+            key = next_key
+        self.purge_cursor = key
+        return removed
+
+
+    def stats(self):
+        stats = {
+            "size": self.total_used,
+            "capacity": self.capacity,
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "updates": self.updates,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "expirations": self.expirations,
+        }
+        if self.latency is not None:
+            for name, histogram in self.latency.items():
+                stats["{}_latency".format(name)] = histogram.summary()
+        return stats
+
+
+    def enable_latency_sampling(self, sample_every=DEFAULT_SAMPLE_EVERY):
+        # get()/set() count their calls down and time the last one of
+        # every sample_every. Without sampling they only check that
+        # latency is None: no wrapper in the call path.
+        self.sample_every = max(1, sample_every)
+        self.get_countdown = self.set_countdown = self.sample_every
+        self.latency = {"get": Latency_Histogram(), "set": Latency_Histogram()}
+
+
+    def disable_latency_sampling(self):
+        self.latency = None
+
+
+    # Helper method
+    def timed_get(self, addr, default):
+        # The countdown is set one past sample_every, so the inner get()
+        # is not sampled again and leaves it at sample_every
+        self.get_countdown = self.sample_every + 1
+        start = time.perf_counter_ns()
+        value = self.get(addr, default)
+        self.latency["get"].record(time.perf_counter_ns() - start)
+        return value
+
+
+    # Helper method
+    def timed_set(self, addr, value, ttl):
+        self.set_countdown = self.sample_every + 1
+        start = time.perf_counter_ns()
+        stored = self.set(addr, value, ttl)
+        self.latency["set"].record(time.perf_counter_ns() - start)
+        return stored
 
 
     # Helper method
@@ -98,8 +402,8 @@ class LRU_Cache(object):
 
 
     # Helper method
-    def insert_new_item(self, key, value):
-        self.cache_map[key] = MAP_Node(value)
+    def insert_new_item(self, key, value, size=0, expires=None):
+        self.cache_map[key] = MAP_Node(value, size, expires)
         if self.total_used == 0:
             self.most_recent_addr = key
             self.least_recent_addr = key
@@ -108,6 +412,7 @@ class LRU_Cache(object):
             self.cache_map[self.most_recent_addr].next = key
             self.most_recent_addr = key
         self.total_used += 1
+        self.total_bytes += size
 
 
     # Helper method
@@ -115,9 +420,29 @@ class LRU_Cache(object):
         key_to_delete = self.least_recent_addr
         # Detatching the node from DLL tail
         self.least_recent_addr = self.cache_map[self.least_recent_addr].next
-        self.cache_map[self.least_recent_addr].previous = None
+        if self.least_recent_addr is None: # It was the only register
+            self.most_recent_addr = None
+        else:
+            self.cache_map[self.least_recent_addr].previous = None
         # Exclude the least accessed register
-        del self.cache_map[key_to_delete]
+        self.total_bytes -= self.cache_map.pop(key_to_delete).size
+        self.total_used -= 1
+        self.evictions += 1
+
+
+    # Helper method
+    def delete_item(self, key):
+        node = self.cache_map.pop(key)
+        # Detatching the node from wherever it is in the DLL
+        if node.previous is None:
+            self.least_recent_addr = node.next
+        else:
+            self.cache_map[node.previous].next = node.next
+        if node.next is None:
+            self.most_recent_addr = node.previous
+        else:
+            self.cache_map[node.next].previous = node.previous
+        self.total_bytes -= node.size
         self.total_used -= 1
 
 
@@ -139,95 +464,173 @@ class LRU_Cache(object):
         return repr_str
 
 
-print("\n\n")
-print("# Test Cases")
-our_cache = LRU_Cache(5)
-
-print("\n\n")
-print("# Test Case 0: Get from empty LRU cache")
-print("\nGetting values from key # 1\n")
-print(our_cache.get(1))
-print(our_cache)
-# It is expected to see nothing, since cache has no data.
-
-
-print("\n\n")
-print("# Test Case 1: Fill some data in LRU cache")
-print("\nSetting values 100, 200 and 300\n")
-our_cache.set(1, 100)
-print(our_cache)
-our_cache.set(2, 200)
-print(our_cache)
-our_cache.set(3, 300)
-print(our_cache)
-# It is expected to see data ordering in sequence (newer to older).
-
-
-print("\n\n")
-print("# Test Case 2: Some cache hits")
-print("\nGetting values from 2, 1 and 4 keys\n")
-print(our_cache.get(2))
-print(our_cache)
-print(our_cache.get(1))
-print(our_cache)
-print(our_cache.get(3))
-print(our_cache)
-# It is expected to see sequence updates. 
-# Less accessed data going to tail end (In direction of least recent).
-
-
-print("\n\n")
-print("# Test Case 3: Putting some more data in cache")
-print("\nSetting values 800 and 700\n")
-our_cache.set(8, 800)
-print(our_cache)
-our_cache.set(7, 700)
-print(our_cache)
-# The cache is expected to be filled to full capacity.
-
-
-print("\n\n")
-print("# Test Case 4: Overwriting data in cache")
-print("\nSetting value 900\n")
-our_cache.set(9, 900)
-print(our_cache)
-# It is expected that the least accessed register will be deleted and
-# the new value 900 will be accommodated at the beginning of the sequence.
-
-
-print("\n\n")
-print("# Test Case 5: Getting older data in cache")
-print("\nGetting register from key #2\n")
-print(our_cache.get(2))
-print(our_cache)
-# It is expected to see a cache miss since the value 200 (address #2) is 
-# no longer available in cache. That's because it was deleted to make room 
-# for value 900 in tast case 4.
-
-
-print("\n\n")
-print("# Test Case 6: Getting older data in cache")
-print("\nGetting register from key #1\n")
-print(our_cache.get(1))
-print(our_cache)
-# It is expected to see a cache hit and the value 100 jumping into head end 
-# (most recent) in sequence.
-
-
-print("\n\n")
-print("# Test Case 7: Cache with invalid sizes")
-our_new_cache = LRU_Cache(-1)
-print("\nCache size: {}\n".format(our_new_cache.capacity))
-# Expected to see the default value for invalid numbers
-
-our_new_cache = LRU_Cache()
-print("\nCache size: {}\n".format(our_new_cache.capacity))
-# Expected to see the default value if not given 
-
-
-print("\n\n")
-print("# Test Case 8: Too high value argument")
-our_new_cache = LRU_Cache(1048576)
-print("\nCache size: {}\n".format(our_new_cache.capacity))
-# Expected to see the MAX_CAPACITY parameter value for numbers that are too high
-
+if __name__ == "__main__":
+
+    print("\n\n")
+    print("# Test Cases")
+    our_cache = LRU_Cache(5)
+
+    print("\n\n")
+    print("# Test Case 0: Get from empty LRU cache")
+    print("\nGetting values from key # 1\n")
+    print(our_cache.get(1))
+    print(our_cache)
+    # It is expected to see nothing, since cache has no data.
+
+
+    print("\n\n")
+    print("# Test Case 1: Fill some data in LRU cache")
+    print("\nSetting values 100, 200 and 300\n")
+    our_cache.set(1, 100)
+    print(our_cache)
+    our_cache.set(2, 200)
+    print(our_cache)
+    our_cache.set(3, 300)
+    print(our_cache)
+    # It is expected to see data ordering in sequence (newer to older).
+
+
+    print("\n\n")
+    print("# Test Case 2: Some cache hits")
+    print("\nGetting values from 2, 1 and 4 keys\n")
+    print(our_cache.get(2))
+    print(our_cache)
+    print(our_cache.get(1))
+    print(our_cache)
+    print(our_cache.get(3))
+    print(our_cache)
+    # It is expected to see sequence updates. 
+    # Less accessed data going to tail end (In direction of least recent).
+
+
+    print("\n\n")
+    print("# Test Case 3: Putting some more data in cache")
+    print("\nSetting values 800 and 700\n")
+    our_cache.set(8, 800)
+    print(our_cache)
+    our_cache.set(7, 700)
+    print(our_cache)
+    # The cache is expected to be filled to full capacity.
+
+
+    print("\n\n")
+    print("# Test Case 4: Overwriting data in cache")
+    print("\nSetting value 900\n")
+    our_cache.set(9, 900)
+    print(our_cache)
+    # It is expected that the least accessed register will be deleted and
+    # the new value 900 will be accommodated at the beginning of the sequence.
+
+
+    print("\n\n")
+    print("# Test Case 5: Getting older data in cache")
+    print("\nGetting register from key #2\n")
+    print(our_cache.get(2))
+    print(our_cache)
+    # It is expected to see a cache miss since the value 200 (address #2) is 
+    # no longer available in cache. That's because it was deleted to make room 
+    # for value 900 in tast case 4.
+
+
+    print("\n\n")
+    print("# Test Case 6: Getting older data in cache")
+    print("\nGetting register from key #1\n")
+    print(our_cache.get(1))
+    print(our_cache)
+    # It is expected to see a cache hit and the value 100 jumping into head end 
+    # (most recent) in sequence.
+
+
+    print("\n\n")
+    print("# Test Case 7: Cache with invalid sizes")
+    our_new_cache = LRU_Cache(-1)
+    print("\nCache size: {}\n".format(our_new_cache.capacity))
+    # Expected to see the default value for invalid numbers
+
+    our_new_cache = LRU_Cache()
+    print("\nCache size: {}\n".format(our_new_cache.capacity))
+    # Expected to see the default value if not given 
+
+
+    print("\n\n")
+    print("# Test Case 8: Large capacity argument")
+    our_new_cache = LRU_Cache(1048576)
+    print("\nCache size: {}\n".format(our_new_cache.capacity))
+    # Expected to see the requested capacity, there is no upper limit
+
+
+    print("\n\n")
+    print("# Test Case 9: Byte budget eviction")
+    our_new_cache = LRU_Cache(100, max_bytes=1000, sizeof=len)
+    our_new_cache.set("a", "x" * 400)
+    our_new_cache.set("b", "y" * 400)
+    our_new_cache.set("c", "z" * 400)
+    print("\nBytes: {}, Registers: {}, Evictions: {}\n".format(
+        our_new_cache.total_bytes, our_new_cache.total_used,
+        our_new_cache.evictions))
+    print(our_new_cache.get("a") == -1)
+    # Expected to see 800 bytes in 2 registers after 1 eviction: the register
+    # 'a' was dropped so 'c' could fit the budget.
+
+
+    print("\n\n")
+    print("# Test Case 10: Value bigger than the whole budget")
+    print(our_new_cache.set("d", "w" * 2000))
+    print("\nBytes: {}, Rejections: {}\n".format(
+        our_new_cache.total_bytes, our_new_cache.rejections))
+    # Expected to see False and the cache content untouched.
+
+
+    print("\n\n")
+    print("# Test Case 11: Registers with time-to-live")
+    fake_time = [0.0]
+    our_new_cache = LRU_Cache(5, default_ttl=10, clock=lambda: fake_time[0])
+    our_new_cache.set(1, 100)
+    our_new_cache.set(2, 200, ttl=60)
+    fake_time[0] = 30.0
+    print(our_new_cache.get(1), our_new_cache.get(2))
+    print("\nRegisters: {}, Expirations: {}\n".format(
+        our_new_cache.total_used, our_new_cache.expirations))
+    # Expected to see -1 200: key 1 is older than its 10 seconds ttl and was
+    # unlinked on access, key 2 still has 30 seconds left.
+
+
+    print("\n\n")
+    print("# Test Case 12: Incremental purge from the least recent end")
+    for key in range(3, 6):
+        our_new_cache.set(key, key * 100, ttl=5)
+    fake_time[0] = 40.0
+    print(our_new_cache.purge_expired(2))
+    print(our_new_cache.purge_expired(2))
+    print(our_new_cache)
+    # Expected to see 1 then 2: the first walk checks keys 2 (still fresh)
+    # and 3, the second one resumes at keys 4 and 5. Only key 2 is left.
+
+
+    print("\n\n")
+    print("# Test Case 13: Batch get and set")
+    our_new_cache = LRU_Cache(3)
+    print(our_new_cache.set_many({1: 100, 2: 200, 3: -1}))
+    print(our_new_cache.get_many([1, 3, 4]))
+    miss = object()
+    print(our_new_cache.get(3, miss) is miss, our_new_cache.get(4, miss) is miss)
+    # Expected to see 3, then [100, -1, -1] where only the second -1 is a
+    # cached value, which a unique default tells apart: False True.
+
+
+    print("\n\n")
+    print("# Test Case 14: Counters and sampled latency")
+    our_new_cache = LRU_Cache(2)
+    our_new_cache.enable_latency_sampling(sample_every=1)
+    our_new_cache.set(1, 100)
+    our_new_cache.set(2, 200)
+    our_new_cache.set(1, 111)
+    our_new_cache.set(3, 300)
+    our_new_cache.get(1)
+    our_new_cache.get(2)
+    stats = our_new_cache.stats()
+    print({name: stats[name] for name in ("hits", "misses", "inserts",
+                                          "updates", "evictions")})
+    print(stats["get_latency"]["samples"], stats["set_latency"]["samples"])
+    # Expected to see 1 hit, 1 miss, 3 inserts, 1 update and 1 eviction,
+    # then 2 get and 4 set latency samples.
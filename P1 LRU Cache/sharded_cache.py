@@ -0,0 +1,134 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Thread-safe variants
+
+import threading
+
+from problem_1 import LRU_Cache, DEFAULT_CAPACITY
+
+# Script Params
+DEFAULT_SHARDS = 16
+
+
+class Locked_LRU_Cache(object):
+    """
+    LRU Cache guarded by one global lock.
+    Every get() also rewrites the recency links (see update_most_recent),
+    so reads must be serialized just like writes.
+    Interface:
+        Same .get(address) / .set(address, value) contract as LRU_Cache.
+    Params:
+        capacity - Cache lenght. Same rules as LRU_Cache.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.cache = LRU_Cache(capacity)
+        self.capacity = self.cache.capacity
+        self.lock = threading.Lock()
+
+    def get(self, addr):
+        with self.lock:
+            return self.cache.get(addr)
+
+    def set(self, addr, value):
+        with self.lock:
+            self.cache.set(addr, value)
+
+    def __len__(self):
+        return self.cache.total_used
+
+    def __repr__(self):
+        with self.lock:
+            return repr(self.cache)
+
+
+class Sharded_LRU_Cache(object):
+    """
+    Thread-safe LRU Cache split into independent segments.
+    Each key is routed by its hash to one of N LRU_Cache shards and every
+    shard has its own lock, so threads touching different shards never
+    wait on each other. Recency is tracked per shard, which means the
+    evicted register is the least recently used one of its own shard.
+    Interface:
+        Same .get(address) / .set(address, value) contract as LRU_Cache.
+    Params:
+        capacity - Total cache lenght, split evenly among the shards.
+                   Invalid numbers assume the DEFAULT_CAPACITY param.
+        shards - Number of segments. Optional argument. Expected type <int>
+                 It is reduced if there is not at least one register
+                 per shard.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, shards=DEFAULT_SHARDS):
+
+        # Size consistency
+        if capacity <= 0:
+            capacity = DEFAULT_CAPACITY
+        if shards <= 0:
+            shards = DEFAULT_SHARDS
+        shards = min(shards, capacity)
+
+        self.capacity = capacity
+        self.total_shards = shards
+        # Spreads the remainder so the shard capacities add up to capacity
+        base, extra = divmod(capacity, shards)
+        self.shards = [LRU_Cache(base + (1 if i < extra else 0))
+                       for i in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+
+    def get(self, addr):
+        index = hash(addr) % self.total_shards
+        with self.locks[index]:
+            return self.shards[index].get(addr)
+
+    def set(self, addr, value):
+        index = hash(addr) % self.total_shards
+        with self.locks[index]:
+            self.shards[index].set(addr, value)
+
+    def __len__(self):
+        return sum(shard.total_used for shard in self.shards)
+
+    def __repr__(self):
+        repr_str = ""
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                repr_str += "shard #{}\n{}".format(index, repr(shard))
+        return repr_str
+
+
+if __name__ == "__main__":
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\n\n")
+    print("# Test Case 1: Same get/set contract as LRU_Cache")
+    our_cache = Sharded_LRU_Cache(8, shards=4)
+    for key in range(8):
+        our_cache.set(key, key * 100)
+    print([our_cache.get(key) for key in range(8)])
+    print(our_cache.get(42))
+    # Expected to see all the values stored and -1 for the missing key.
+
+    print("\n\n")
+    print("# Test Case 2: Shard count limited by capacity")
+    our_cache = Sharded_LRU_Cache(3, shards=16)
+    print("\nShards: {}, Capacity: {}\n".format(our_cache.total_shards,
+                                                our_cache.capacity))
+    # Expected to see 3 shards, one register each.
+
+    print("\n\n")
+    print("# Test Case 3: Concurrent access from a thread pool")
+    our_cache = Sharded_LRU_Cache(256, shards=8)
+
+    def worker(seed):
+        for i in range(5000):
+            key = (seed * 7919 + i) % 512
+            if our_cache.get(key) == -1:
+                our_cache.set(key, key)
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        print(all(pool.map(worker, range(8))))
+    print("\nRegisters in cache: {}\n".format(len(our_cache)))
+    # Expected to see True and no more registers than the cache capacity.
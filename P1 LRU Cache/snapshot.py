@@ -0,0 +1,196 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #1 - LRU Cache - Warm-start snapshots
+
+import gc
+import itertools
+import mmap
+import os
+import pickle
+import struct
+from array import array
+
+from problem_1 import LRU_Cache, MAP_Node
+
+# Snapshot file layout (little endian):
+#   header  - magic, version, registers, capacity and the three block sizes
+#   keys    - pickled list of keys, least to most recent
+#   values  - pickled list of values, same order
+#   ttls    - C double array of remaining seconds to live (NaN: never
+#             expires). Empty block when no register had a ttl.
+SNAPSHOT_MAGIC = b"LRUS"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<4sB3xQQQQQ")
+NO_TTL = float("nan")
+
+
+def save_snapshot(cache, path):
+    """
+    Writes the registers of a LRU_Cache to path in recency order, walking
+    from least_recent_addr through the next links. Expired registers are
+    left out. The file is written aside and renamed, so a crash never
+    leaves a half written snapshot behind.
+    Keys and values must be picklable.
+    Returns the number of registers written.
+    """
+    keys, values, ttls = [], [], array("d")
+    now = cache.clock()
+    has_ttl = False
+    key = cache.least_recent_addr
+    while key is not None:
+        node = cache.cache_map[key]
+        if node.expires is None:
+            ttls.append(NO_TTL)
+        elif node.expires > now:
+            ttls.append(node.expires - now)
+            has_ttl = True
+        else: # Stale register
+            key = node.next
+            continue
+        keys.append(key)
+        values.append(node.value)
+        key = node.next
+
+    keys_blob = pickle.dumps(keys, protocol=pickle.HIGHEST_PROTOCOL)
+    values_blob = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+    ttls_blob = ttls.tobytes() if has_ttl else b""
+
+    temporary_path = "{}.tmp".format(path)
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                        len(keys), cache.capacity,
+                                        len(keys_blob), len(values_blob),
+                                        len(ttls_blob)))
+        snapshot_file.write(keys_blob)
+        snapshot_file.write(values_blob)
+        snapshot_file.write(ttls_blob)
+    os.replace(temporary_path, path)
+    return len(keys)
+
+
+def load_snapshot(path, capacity=None, **cache_params):
+    """
+    Rebuilds a LRU_Cache from a snapshot written by save_snapshot().
+    The file is memory-mapped and the blocks are unpickled straight from
+    the mapping. The hash map is then built in one go and the recency
+    links are set in a single pass, instead of going through set() (and
+    its eviction checks and relinking) one register at a time. The cyclic
+    garbage collector is paused meanwhile: the rebuild allocates millions
+    of nodes but no reference cycles, so its passes would be pure cost.
+    Params:
+        capacity - Capacity of the new cache. Defaults to the one saved.
+                   When smaller than the snapshot only the most recent
+                   registers are kept.
+        cache_params - Any other LRU_Cache argument (max_bytes, sizeof,
+                       default_ttl, ...). With max_bytes, least recent
+                       registers are evicted until the budget is met.
+    Raises ValueError if the file is not a snapshot.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return restore_cache(path, capacity, cache_params)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+# Helper function for load_snapshot(), runs with the gc paused
+def restore_cache(path, capacity, cache_params):
+    with open(path, "rb") as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                if len(view) < HEADER.size:
+                    raise ValueError("{} is not a LRU_Cache snapshot".format(path))
+                (magic, version, count, saved_capacity, keys_len, values_len,
+                 ttls_len) = HEADER.unpack_from(view)
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    raise ValueError("{} is not a LRU_Cache snapshot".format(path))
+                offset = HEADER.size
+                keys = pickle.loads(view[offset:offset + keys_len])
+                offset += keys_len
+                values = pickle.loads(view[offset:offset + values_len])
+                offset += values_len
+                ttls = None
+                if ttls_len:
+                    ttls = array("d")
+                    ttls.frombytes(view[offset:offset + ttls_len])
+            finally:
+                view.release()
+
+    cache = LRU_Cache(capacity if capacity is not None else saved_capacity,
+                      **cache_params)
+    if count > cache.capacity: # Keeps the most recent registers only
+        skip = count - cache.capacity
+        keys, values = keys[skip:], values[skip:]
+        if ttls is not None:
+            ttls = ttls[skip:]
+        count = cache.capacity
+    if count == 0:
+        return cache
+
+    nodes = [MAP_Node(value) for value in values]
+    if ttls is not None:
+        now = cache.clock()
+        for node, ttl in zip(nodes, ttls):
+            if ttl == ttl: # Not NaN
+                node.expires = now + ttl
+    if cache.max_bytes is not None:
+        sizeof = cache.sizeof
+        for node in nodes:
+            node.size = sizeof(node.value)
+            cache.total_bytes += node.size
+
+    # Recency links: every node points to its neighbour keys
+    previous_keys = itertools.chain((None,), keys)
+    next_keys = itertools.chain(itertools.islice(keys, 1, None), (None,))
+    for node, previous, next in zip(nodes, previous_keys, next_keys):
+        node.previous = previous
+        node.next = next
+
+    cache.cache_map = dict(zip(keys, nodes))
+    cache.least_recent_addr = keys[0]
+    cache.most_recent_addr = keys[-1]
+    cache.total_used = count
+
+    if cache.max_bytes is not None:
+        while cache.total_bytes > cache.max_bytes:
+            cache.delete_least_recent()
+    return cache
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    snapshot_path = os.path.join(tempfile.mkdtemp(), "cache.snapshot")
+
+    print("\n\n")
+    print("# Test Case 1: Snapshot and restore keep the recency order")
+    our_cache = LRU_Cache(5)
+    for key in range(1, 6):
+        our_cache.set(key, key * 100)
+    our_cache.get(1)
+    print(save_snapshot(our_cache, snapshot_path))
+    print(load_snapshot(snapshot_path))
+    # Expected to see 5 registers saved and the sequence 2, 3, 4, 5, 1.
+
+    print("\n\n")
+    print("# Test Case 2: Restoring into a smaller cache")
+    restored = load_snapshot(snapshot_path, capacity=2)
+    print(restored)
+    restored.set(6, 600)
+    print(restored.get(5), restored.get(1), restored.get(6))
+    # Expected to see only keys 5 and 1 (the most recent ones), then
+    # -1 100 600 since key 5 was evicted by key 6.
+
+    print("\n\n")
+    print("# Test Case 3: Not a snapshot file")
+    with open(snapshot_path, "wb") as not_a_snapshot:
+        not_a_snapshot.write(b"hello")
+    try:
+        load_snapshot(snapshot_path)
+    except ValueError as error:
+        print(error)
+    # Expected to see an error message.
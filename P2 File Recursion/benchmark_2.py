@@ -0,0 +1,223 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #2 - File Recursion - Benchmarks
+#
+# Usage: python benchmark_2.py [section ...]
+# With no arguments every section is run.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from file_hashing import find_duplicates, hash_files, DEFAULT_WORKERS
+from parallel_find import find_files_parallel
+from problem_2 import iter_file_entries, iter_files
+from suffix_index import Suffix_Index, RACY_SECONDS
+
+
+def make_tree(root, depth=4, fan_out=6, files_per_dir=8):
+  '''
+  Generates a deep and wide test tree: every directory holds fan_out
+  subdirectories (down to depth levels) and files_per_dir files, half
+  of them .c. Returns the number of directories created.
+  '''
+  directories = 1
+  pending = [(root, 0)]
+  while pending:
+    directory, level = pending.pop()
+    os.makedirs(directory, exist_ok=True)
+    for index in range(files_per_dir):
+      extension = ".c" if index % 2 == 0 else ".h"
+      with open(os.path.join(directory, "file{}{}".format(index, extension)), "w"):
+        pass
+    if level < depth:
+      for index in range(fan_out):
+        pending.append((os.path.join(directory, "dir{}".format(index)), level + 1))
+        directories += 1
+  return directories
+
+
+class Slow_Scandir(object):
+  '''
+  Wraps os.scandir adding a fixed delay per directory listing, a rough
+  model of a network file system round trip. The delay is a sleep, so
+  like real I/O it releases the GIL.
+  '''
+
+  def __init__(self, latency):
+    self.latency = latency
+    self.scandir = os.scandir
+
+  def __call__(self, path):
+    time.sleep(self.latency)
+    return self.scandir(path)
+
+  def __enter__(self):
+    os.scandir = self
+    return self
+
+  def __exit__(self, *exc_info):
+    os.scandir = self.scandir
+
+
+def bench_parallel(worker_counts=(1, 2, 4, 8, 16, 32), latencies=(0.0, 0.002)):
+  '''
+  Sequential iter_files() against find_files_parallel() at several
+  worker counts, on the local disk and with a simulated per-listing
+  latency.
+  '''
+  root = tempfile.mkdtemp()
+  try:
+    directories = make_tree(os.path.join(root, "tree"))
+    tree = os.path.join(root, "tree")
+    for latency in latencies:
+      print("\n# Parallel walk: {:,} directories, {:.1f} ms per listing".format(
+        directories, latency * 1000))
+      print("{:>12} {:>10} {:>10}".format("walker", "seconds", "speed-up"))
+      with Slow_Scandir(latency):
+        start = time.perf_counter()
+        expected = set(iter_files(".c", tree))
+        sequential = time.perf_counter() - start
+        print("{:>12} {:>10.3f} {:>10.2f}".format("sequential", sequential, 1.0))
+        for workers in worker_counts:
+          start = time.perf_counter()
+          found = find_files_parallel(".c", tree, workers=workers)
+          elapsed = time.perf_counter() - start
+          assert found == expected
+          print("{:>12} {:>10.3f} {:>10.2f}".format(
+            "{} workers".format(workers), elapsed, sequential / elapsed))
+  finally:
+    shutil.rmtree(root)
+
+
+def bench_index(changed_dirs=5):
+  '''
+  Persistent suffix index: full walk against the first index build and
+  against later refreshes, with nothing changed and with a few
+  directories changed.
+  '''
+  root = tempfile.mkdtemp()
+  try:
+    tree = os.path.join(root, "tree")
+    index_path = os.path.join(root, "tree.index")
+    directories = make_tree(tree, depth=5)
+    print("\n# Suffix index over {:,} directories".format(directories))
+
+    start = time.perf_counter()
+    expected = set(iter_files(".c", tree))
+    print("full walk (iter_files):   {:8.3f} s".format(time.perf_counter() - start))
+
+    start = time.perf_counter()
+    index = Suffix_Index(tree)
+    index.refresh()
+    index.save(index_path)
+    print("first build and save:     {:8.3f} s".format(time.perf_counter() - start))
+    time.sleep(RACY_SECONDS) # Lets the fresh listings become trusted
+    index.refresh()
+    index.save(index_path)
+
+    start = time.perf_counter()
+    index = Suffix_Index.load(index_path, tree)
+    counts = index.refresh()
+    found = index.find(".c")
+    print("load, refresh, query:     {:8.3f} s  {}".format(
+      time.perf_counter() - start, counts))
+    assert found == expected
+
+    for number in range(changed_dirs):
+      directory = os.path.join(tree, *["dir{}".format(number)] * 3)
+      open(os.path.join(directory, "added.c"), "w").close()
+    start = time.perf_counter()
+    counts = index.refresh()
+    found = index.find(".c")
+    print("refresh after changes:    {:8.3f} s  {}".format(
+      time.perf_counter() - start, counts))
+    assert found == set(iter_files(".c", tree))
+  finally:
+    shutil.rmtree(root)
+
+
+def bench_prune():
+  '''
+  A monorepo-like tree, sources next to a much bigger node_modules and
+  .git: walking everything and dropping those paths afterwards against
+  pruning them with exclude, and follow_links off against on.
+  '''
+  root = tempfile.mkdtemp()
+  try:
+    tree = os.path.join(root, "tree")
+    source_dirs = make_tree(os.path.join(tree, "src"), depth=3)
+    vendored_dirs = make_tree(os.path.join(tree, "node_modules"), depth=4)
+    vendored_dirs += make_tree(os.path.join(tree, ".git"), depth=4)
+    print("\n# Pruning: {:,} source and {:,} vendored directories".format(
+      source_dirs, vendored_dirs))
+    skipped = (os.sep + "node_modules" + os.sep, os.sep + ".git" + os.sep)
+
+    start = time.perf_counter()
+    expected = {item for item in iter_files(".c", tree)
+                if not any(part in item for part in skipped)}
+    print("walk all, filter after:   {:8.3f} s".format(time.perf_counter() - start))
+
+    for follow_links in (True, False):
+      start = time.perf_counter()
+      found = set(iter_files(".c", tree, exclude=["node_modules", ".git"],
+                             follow_links=follow_links))
+      print("exclude, follow_links={!s:5} {:6.3f} s".format(
+        follow_links, time.perf_counter() - start))
+      assert found == expected
+  finally:
+    shutil.rmtree(root)
+
+
+def bench_hashing(files=2000, file_size=64 * 1024, duplicates=50):
+  '''
+  Duplicate detection: hashing every file against grouping by size
+  first, with one process and with a process pool. Files have random
+  sizes around file_size, a few of them copied.
+  '''
+  import random
+  root = tempfile.mkdtemp()
+  try:
+    generator = random.Random(1)
+    paths = []
+    for index in range(files):
+      path = os.path.join(root, "file{}.c".format(index))
+      with open(path, "wb") as content_file:
+        content_file.write(generator.randbytes(file_size + generator.randrange(file_size)))
+      paths.append(path)
+    for index in range(duplicates):
+      shutil.copy(paths[index], os.path.join(root, "copy{}.c".format(index)))
+    print("\n# Duplicates among {:,} files of ~{} KiB, {} copied".format(
+      files + duplicates, file_size * 3 // 2048, duplicates))
+
+    start = time.perf_counter()
+    by_digest = {}
+    for path, digest in hash_files([entry.path for entry in iter_file_entries(root)], 1).items():
+      by_digest.setdefault(digest, []).append(path)
+    expected = sorted(sorted(group) for group in by_digest.values() if len(group) > 1)
+    print("hash every file:          {:8.3f} s".format(time.perf_counter() - start))
+
+    for workers in sorted({1, max(2, DEFAULT_WORKERS)}):
+      start = time.perf_counter()
+      found = find_duplicates(iter_file_entries(root), workers)
+      print("size groups, {:2} workers: {:8.3f} s".format(
+        workers, time.perf_counter() - start))
+      assert found == expected
+  finally:
+    shutil.rmtree(root)
+
+
+SECTIONS = {
+  "parallel": bench_parallel,
+  "index": bench_index,
+  "prune": bench_prune,
+  "hashing": bench_hashing,
+}
+
+
+if __name__ == "__main__":
+  selected = sys.argv[1:] or list(SECTIONS)
+  for name in selected:
+    SECTIONS[name]()
@@ -0,0 +1,173 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #2 - File Recursion - Content hashing and duplicates
+
+import hashlib
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Script Params
+HASH_NAME = "sha256" # Hardware accelerated on most CPUs, faster than blake2b
+CHUNK_SIZE = 1 << 20 # Bytes hashed per update() call
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Below this many files a process pool costs more than it saves
+MIN_POOL_FILES = 64
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+  """
+  Hex digest of the content of the file at path.
+
+  The file is memory-mapped and hashed a chunk at a time through a
+  memoryview: no copy into Python bytes objects, the pages are read on
+  demand, and hashlib releases the GIL on every large chunk.
+
+  Raises OSError if the file cannot be read.
+  """
+  digest = hashlib.new(HASH_NAME)
+  with open(path, "rb") as content_file:
+    try:
+      mapped = mmap.mmap(content_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError: # Empty files cannot be mapped
+      return digest.hexdigest()
+    with mapped:
+      view = memoryview(mapped)
+      try:
+        for offset in range(0, len(view), chunk_size):
+          digest.update(view[offset:offset + chunk_size])
+      finally:
+        view.release()
+  return digest.hexdigest()
+
+
+# Helper function, runs in the pool: (path, digest), digest None when the
+# file could not be read
+def hash_path(path):
+  try:
+    return path, hash_file(path)
+  except OSError:
+    return path, None
+
+
+def hash_files(paths, workers=DEFAULT_WORKERS):
+  """
+  Content digests of many files, hashed in a process pool when there
+  are enough of them to pay for it.
+
+  Args:
+    paths(iterable of str): files to hash
+    workers(int): number of hashing processes, 1 hashes in this process
+
+  Returns:
+     a dict mapping every readable path to its hex digest
+  """
+  paths = list(paths)
+  if workers > 1 and len(paths) >= MIN_POOL_FILES:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      # Batches of paths per task, so small files are not dominated by
+      # the pickling round trips
+      results = list(pool.map(hash_path, paths,
+                              chunksize=max(1, len(paths) // (workers * 4))))
+  else:
+    results = [hash_path(path) for path in paths]
+  return {path: digest for path, digest in results if digest is not None}
+
+
+def group_by_size(items):
+  """
+  Groups files by size.
+
+  Args:
+    items(iterable): file paths, or the os.DirEntry objects yielded by
+      iter_file_entries(), whose cached stat is reused without a syscall
+
+  Returns:
+     a dict mapping every size to the list of paths of that size
+  """
+  by_size = {}
+  for item in items:
+    try:
+      if isinstance(item, os.DirEntry):
+        size, path = item.stat().st_size, item.path
+      else:
+        size, path = os.stat(item).st_size, item
+    except OSError: # Vanished meanwhile
+      continue
+    by_size.setdefault(size, []).append(path)
+  return by_size
+
+
+def find_duplicates(items, workers=DEFAULT_WORKERS):
+  """
+  Finds the files with identical content.
+
+  Files are grouped by size first: a file whose size no other file has
+  cannot have a duplicate, so it is never read. Only the files sharing
+  their size are hashed (see hash_files()). Empty files are left out.
+
+  Args:
+    items(iterable): file paths or os.DirEntry objects, as in
+      group_by_size()
+    workers(int): number of hashing processes
+
+  Returns:
+     a list of groups of duplicates, every group a sorted list of paths
+  """
+  candidates = [path for size, paths in group_by_size(items).items()
+                if size > 0 and len(paths) > 1 for path in paths]
+  by_digest = {}
+  for path, digest in hash_files(candidates, workers).items():
+    by_digest.setdefault(digest, []).append(path)
+  return sorted(sorted(paths) for paths in by_digest.values() if len(paths) > 1)
+
+
+if __name__ == "__main__":
+
+  import shutil
+  import tempfile
+
+  from problem_2 import iter_file_entries
+
+  work_dir = tempfile.mkdtemp()
+  for directory in ("src", "backup", "other"):
+    os.makedirs(os.path.join(work_dir, directory))
+  contents = {
+    "src/main.c": "int main() { return 0; }\n",
+    "backup/main.c": "int main() { return 0; }\n", # Same content
+    "other/main.c": "int main() { return 1; }\n", # Same size, other content
+    "src/util.c": "void util() {}\n",
+    "backup/util.c": "void util() {}\n", # Same content
+    "src/big.c": "int x;\n" * 1000, # Unique size
+  }
+  for name, content in contents.items():
+    with open(os.path.join(work_dir, name), "w") as content_file:
+      content_file.write(content)
+
+  def relative(paths):
+    return [os.path.relpath(path, work_dir) for path in paths]
+
+  print("\n\n")
+  print("# Test Case 1: Duplicate source files")
+  entries = list(iter_file_entries(work_dir))
+  for group in find_duplicates(entries):
+    print(relative(group))
+  # Expected to see the two main.c copies and the two util.c copies.
+  # other/main.c has the same size but another content.
+
+  print("\n\n")
+  print("# Test Case 2: Files with a unique size are never hashed")
+  by_size = group_by_size(entries)
+  print(sorted(len(paths) for paths in by_size.values()))
+  print(relative(by_size[len(contents["src/big.c"])]))
+  # Expected to see [1, 2, 3]: big.c alone in its size group, so it is
+  # not read by find_duplicates().
+
+  print("\n\n")
+  print("# Test Case 3: Digest of an empty file and of a missing file")
+  open(os.path.join(work_dir, "empty.c"), "w").close()
+  print(hash_file(os.path.join(work_dir, "empty.c")) == hashlib.new(HASH_NAME).hexdigest())
+  print(hash_files([os.path.join(work_dir, "missing.c")]))
+  # Expected to see True and {}: unreadable files are left out.
+
+  shutil.rmtree(work_dir)
@@ -0,0 +1,100 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #2 - File Recursion - Command line entry point
+#
+# Usage: python find_files_cli.py [-s SUFFIX ...] [-j JOBS] [-0] [path ...]
+#
+#   python find_files_cli.py -s .c -s .h src
+#   python find_files_cli.py -s .py -x .git -x node_modules -0 . | xargs -0 wc -l
+
+import argparse
+import os
+import sys
+
+from parallel_find import iter_paths_parallel
+from problem_2 import Name_Matcher, iter_file_entries
+
+
+def iter_found(path, matcher, jobs=1, **walk_params):
+  """
+  Yields the paths beneath path whose file name matches any pattern of
+  matcher (a Name_Matcher), as soon as they are found: with one job from
+  the sequential walk, otherwise from the parallel one.
+  """
+  if jobs > 1:
+    yield from iter_paths_parallel(path, matcher.match, workers=jobs,
+                                   **walk_params)
+  else:
+    for entry in iter_file_entries(path, is_match=matcher.match, **walk_params):
+      yield entry.path
+
+
+# Helper function: the command line parser
+def make_parser():
+  parser = argparse.ArgumentParser(
+    description="Find the files beneath the given paths by file name suffix.")
+  parser.add_argument("paths", nargs="*", default=["."], metavar="path",
+                      help="directories to search (default: .)")
+  parser.add_argument("-s", "--suffix", action="append", required=True,
+                      help="file name suffix ('.c', 'h') or glob ('test_*.py'). "
+                           "Repeat it to match several in one walk.")
+  parser.add_argument("-j", "--jobs", type=int, default=1,
+                      help="directories listed at once (default: 1)")
+  parser.add_argument("-0", "--null", action="store_true",
+                      help="end every path with a NUL byte instead of a "
+                           "newline, for xargs -0")
+  parser.add_argument("-x", "--exclude", action="append", default=[],
+                      help="file or directory name glob to skip; excluded "
+                           "directories are not descended into")
+  parser.add_argument("-d", "--max-depth", type=int, default=None,
+                      help="deepest subdirectory level to descend into")
+  parser.add_argument("-P", "--no-follow-links", dest="follow_links",
+                      action="store_false",
+                      help="do not descend into symlinked directories; "
+                           "symlinked files are still listed (like find -P)")
+  parser.add_argument("--min-size", type=int, default=None, metavar="BYTES",
+                      help="skip files smaller than this")
+  parser.add_argument("--max-size", type=int, default=None, metavar="BYTES",
+                      help="skip files larger than this")
+  parser.add_argument("--modified-after", type=float, default=None,
+                      metavar="EPOCH", help="skip files last modified before "
+                      "this time, in seconds since the epoch")
+  parser.add_argument("--modified-before", type=float, default=None,
+                      metavar="EPOCH", help="skip files last modified at or "
+                      "after this time, in seconds since the epoch")
+  return parser
+
+
+def main(argv=None):
+  parser = make_parser()
+  args = parser.parse_args(argv)
+  if args.jobs < 1:
+    parser.error("--jobs must be at least 1")
+  for path in args.paths:
+    if not os.path.isdir(path):
+      parser.error("not a directory: {}".format(path))
+
+  matcher = Name_Matcher(args.suffix)
+  terminator = b"\0" if args.null else b"\n"
+  # Paths are written as bytes: names that are not valid text (bad
+  # encodings on Linux) round-trip exactly through os.fsencode()
+  output = sys.stdout.buffer
+  try:
+    for path in args.paths:
+      for found in iter_found(path, matcher, args.jobs, exclude=args.exclude,
+                              max_depth=args.max_depth,
+                              follow_links=args.follow_links,
+                              min_size=args.min_size, max_size=args.max_size,
+                              modified_after=args.modified_after,
+                              modified_before=args.modified_before):
+        output.write(os.fsencode(found) + terminator)
+    output.flush()
+  except BrokenPipeError: # Reader went away (head, grep -q, ...)
+    # Keeps the interpreter from complaining again at exit
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,245 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #2 - File Recursion - Parallel traversal
+
+import os
+import queue
+import threading
+
+from problem_2 import compile_globs, make_stat_filter
+
+# Script Params
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 1024
+
+
+def iter_paths_parallel(path, is_match, workers=DEFAULT_WORKERS,
+                        queue_size=DEFAULT_QUEUE_SIZE, exclude=(),
+                        max_depth=None, follow_links=True, **stat_bounds):
+  """
+  Walks the tree beneath path listing several directories at once and
+  yields the paths of the files whose name passes is_match(name).
+
+  On network file systems and cold disks a directory listing is mostly
+  waiting on I/O, which releases the GIL, so a pool of threads keeps
+  many listings in flight instead of one.
+
+  Directories to scan go through a bounded work queue. When the queue
+  is full a worker scans the subdirectory itself instead of blocking,
+  so the workers can never deadlock waiting on each other and the
+  memory held by pending directories stays bounded.
+
+  Each worker hands over the matches of a directory as one batch, so
+  paths are yielded while the walk goes on. Closing the generator early
+  stops the workers.
+
+  Pruning, the depth limit, the size and mtime bounds and the symlink
+  loop detection work as in iter_file_entries(); the set of (device,
+  inode) pairs already walked is shared by the workers behind a lock.
+
+  An exception other than OSError in a worker (from is_match, say)
+  stops the walk and is raised again in the consumer.
+
+  Args:
+    path(str): path of the file system
+    is_match(callable): file name -> truthy when the file is wanted
+    workers(int): number of scanning threads
+    queue_size(int): maximum number of directories waiting in the queue
+    exclude, max_depth, follow_links, stat_bounds: as in
+      iter_file_entries()
+
+  Yields:
+     file paths, in no particular order
+  """
+
+  if not os.path.isdir(path): # Checks path string
+    print("Invalid path.")
+    return
+
+  workers = max(1, workers)
+  excluded = compile_globs(exclude)
+  wanted = make_stat_filter(**stat_bounds)
+
+  visited = None # (device, inode) of the directories walked so far
+  visited_lock = threading.Lock()
+  if follow_links:
+    root_stat = os.stat(path)
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+
+  # Helper function: claims a directory for the walk, False when it was
+  # already walked (symlink loop or several links to it)
+  def claim(entry):
+    entry_stat = entry.stat()
+    dir_id = (entry_stat.st_dev, entry_stat.st_ino)
+    with visited_lock:
+      if dir_id in visited:
+        return False
+      visited.add(dir_id)
+      return True
+
+  work_queue = queue.Queue(maxsize=max(1, queue_size))
+  # Batches of paths, a worker's exception, or None when done
+  found_queue = queue.SimpleQueue()
+  stopping = threading.Event()
+
+  def scan(directory, depth, overflow):
+    descend = max_depth is None or depth < max_depth
+    found = []
+    try:
+      entries = os.scandir(directory)
+    except OSError: # Unreadable or vanished directory
+      return
+    with entries:
+      for entry in entries:
+        if excluded is not None and excluded(entry.name):
+          continue
+        if entry.is_dir(follow_symlinks=follow_links):
+          try:
+            if not descend or (visited is not None and not claim(entry)):
+              continue
+          except OSError: # Dangling or vanished meanwhile
+            continue
+          try:
+            work_queue.put_nowait((entry.path, depth + 1))
+          except queue.Full: # Keeps it for this worker
+            overflow.append((entry.path, depth + 1))
+        elif entry.is_file() and is_match(entry.name):
+          try:
+            if wanted is None or wanted(entry.stat()):
+              found.append(entry.path)
+          except OSError: # Vanished meanwhile
+            continue
+    if found:
+      found_queue.put(found)
+
+  def worker():
+    while True:
+      item = work_queue.get()
+      try:
+        if item is None: # Stop signal, passed on to the next worker
+          work_queue.put_nowait(None)
+          return
+        overflow = [item] # Directories this worker scans itself
+        while overflow and not stopping.is_set():
+          try:
+            scan(*overflow.pop(), overflow)
+          except OSError: # Entry vanished or unreadable while scanning
+            continue
+      except Exception as error: # Handed to the consumer to raise
+        stopping.set()
+        found_queue.put(error)
+      finally:
+        # Only now is this directory and everything it spilled done, so
+        # work_queue.join() cannot return while work is still pending
+        work_queue.task_done()
+
+  def watcher(): # Tells the consumer when every queued directory is done
+    work_queue.join()
+    found_queue.put(None)
+
+  threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+  for thread in threads:
+    thread.start()
+  work_queue.put((path, 0))
+  threading.Thread(target=watcher, daemon=True).start()
+
+  try:
+    while True:
+      found = found_queue.get()
+      if found is None:
+        break
+      if isinstance(found, Exception):
+        raise found
+      yield from found
+  finally:
+    stopping.set() # Workers drain the queue without scanning
+    work_queue.join()
+    # Nothing is queued any more, so the single stop signal always fits;
+    # every worker puts it back for the next one
+    work_queue.put_nowait(None)
+    for thread in threads:
+      thread.join()
+    work_queue.get_nowait() # The signal left by the last worker
+    work_queue.task_done() # Lets the watcher finish
+
+
+def find_files_parallel(suffix, path, workers=DEFAULT_WORKERS, **walk_params):
+  """
+  Find all files beneath path with file name suffix, listing several
+  directories at once. See iter_paths_parallel().
+
+  Args:
+    suffix(str): suffix if the file name to be found
+    path(str): path of the file system
+    workers(int): number of scanning threads
+    walk_params: queue_size, exclude, max_depth, follow_links and the size
+                 and mtime bounds, as in iter_paths_parallel()
+
+  Returns:
+     a set of paths, the same ones iter_files() yields
+  """
+
+  name_suffix = "." + suffix.strip(".") # Compared against the file names
+  return set(iter_paths_parallel(path, lambda name: name.endswith(name_suffix),
+                                 workers, **walk_params))
+
+
+if __name__ == "__main__":
+
+  from problem_2 import iter_files
+
+  script_dir = os.path.dirname(os.path.abspath(__file__))
+
+  for test_dir in ("testdir", "testdir2", "testdir3"):
+    print("\n\n")
+    print("# Test Case: Parallel and sequential walks of {}".format(test_dir))
+    test_path = os.path.join(script_dir, test_dir)
+    parallel = find_files_parallel(".c", test_path, workers=4)
+    sequential = set(iter_files(".c", test_path))
+    for item in sorted(parallel):
+      print(item)
+    print("Same result set: {}".format(parallel == sequential))
+    # Expected to see True.
+
+  print("\n\n")
+  print("# Test Case: Tiny queue forces workers to scan spilled directories")
+  test_path = os.path.join(script_dir, "testdir")
+  print(find_files_parallel(".c", test_path, workers=2, queue_size=1)
+        == set(iter_files(".c", test_path)))
+  # Expected to see True.
+
+  print("\n\n")
+  print("# Test Case: Pruning, depth limit, size filter and symlinks")
+  import shutil
+  import tempfile
+  work_dir = tempfile.mkdtemp()
+  tree = os.path.join(work_dir, "tree")
+  shutil.copytree(os.path.join(script_dir, "testdir"), tree)
+  try:
+    os.symlink(tree, os.path.join(tree, "subdir1", "loop"))
+  except (OSError, NotImplementedError): # No symlink support
+    pass
+  with open(os.path.join(tree, "big.c"), "w") as big_file:
+    big_file.write("int x;\n")
+  try:
+    os.symlink(os.path.join(tree, "big.c"), os.path.join(tree, "subdir2", "link.c"))
+  except (OSError, NotImplementedError):
+    pass
+  for walk_params in ({"exclude": ["subdir3"]}, {"max_depth": 1},
+                      {"min_size": 1}, {"follow_links": False}, {}):
+    print(walk_params, find_files_parallel(".c", tree, workers=4, **walk_params)
+          == set(iter_files(".c", tree, **walk_params)))
+  shutil.rmtree(work_dir)
+  # Expected to see True five times, the loop walked once and the file
+  # symlink found with or without following links.
+
+  print("\n\n")
+  print("# Test Case: A failing is_match is raised, not a hang")
+  def failing_match(name):
+    raise RuntimeError("is_match failed on {}".format(name))
+  try:
+    list(iter_paths_parallel(os.path.join(script_dir, "testdir"), failing_match,
+                             workers=4, queue_size=1))
+  except RuntimeError as error:
+    print(type(error).__name__, error.args[0].startswith("is_match failed"))
+  # Expected to see RuntimeError True.
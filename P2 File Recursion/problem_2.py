@@ -2,52 +2,279 @@
 # Part 2 - Data Structures
 # Project 2 - Problem #2 - File Recursion
 
+import fnmatch
 import os
+import re
 
-def find_files(suffix, path):
+# Characters that make a pattern a glob instead of a plain suffix
+GLOB_CHARS = "*?["
+
+def find_files(suffix, path, **walk_params):
     """
     Find all files beneath path with file name suffix.
 
     Note that a path may contain further subdirectories
     and those subdirectories may also contain further subdirectories.
 
-    There are no limit to the depth of the subdirectories can be.
+    There are no limit to the depth of the subdirectories can be: the
+    tree is walked with an explicit stack (see iter_file_entries()), not
+    by recursion, so Python's recursion limit does not apply.
 
     Args:
       suffix(str): suffix if the file name to be found
       path(str): path of the file system
+      walk_params: exclude, max_depth, follow_links and the size and
+                   mtime bounds, as in iter_file_entries()
 
     Returns:
-       a list of paths
+       a set of paths
     """
-    
+
     if not os.path.exists(path): # Checks path string
       print("Invalid path.")
       return []
-    
-    suffix = suffix.strip(".") # Strips out the dot from suffix param
-    
-    # Initialize a structure to accumulate .c files that are found
-    found_dirs = set() 
-    # creates a list of entries in current path directory
-    current_list = os.listdir(path)
-
-    for entry in current_list:
-
-      # formats a pathname including current directory and entry
-      pathname = "{}\\{}".format(path, entry)
-
-      # If the entry is a directory, it calls find_files() recursively
-      if os.path.isdir(pathname):
-        found_dirs = found_dirs.union(find_files(suffix, pathname))
-      
-      # If the entry is a file and it has the given suffix, accumulate result
-      if os.path.isfile(pathname):
-        file_name, file_suffix = entry.rsplit(".", 1)
-        if file_suffix == suffix:
-          found_dirs.add(pathname)
-   
-    return found_dirs
+
+    return set(iter_files(suffix, path, **walk_params))
+
+
+# Helper function: compiles glob patterns into a single regex match
+# function, or None when there are no patterns
+def compile_globs(patterns):
+  patterns = list(patterns)
+  if not patterns:
+    return None
+  return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns)).match
+
+
+# Helper function: builds a predicate over os.stat_result checking the
+# size (bytes) and modification time (seconds since the epoch) bounds
+# that are not None, or returns None when no bound is set
+def make_stat_filter(min_size=None, max_size=None, modified_after=None,
+                     modified_before=None):
+  if min_size is None and max_size is None and modified_after is None \
+     and modified_before is None:
+    return None
+
+  def wanted(file_stat):
+    if min_size is not None and file_stat.st_size < min_size:
+      return False
+    if max_size is not None and file_stat.st_size > max_size:
+      return False
+    if modified_after is not None and file_stat.st_mtime < modified_after:
+      return False
+    if modified_before is not None and file_stat.st_mtime >= modified_before:
+      return False
+    return True
+
+  return wanted
+
+
+def iter_file_entries(path, exclude=(), max_depth=None, follow_links=True,
+                      is_match=None, **stat_bounds):
+    """
+    Walks the tree beneath path and yields an os.DirEntry per file.
+
+    Directories are read with os.scandir(), whose entries already carry
+    the file type read along with the directory listing, so no extra stat
+    call is needed per entry. An explicit stack of directories replaces
+    the recursion, so depth is only limited by memory, and nothing is
+    accumulated: memory use grows with the pending directories, never
+    with the number of results.
+
+    Excluded names are checked before a directory is pushed, so a pruned
+    subtree ('.git', 'node_modules') is never listed at all.
+
+    When symlinks are followed, every directory is identified by its
+    (device, inode) pair and never listed twice: a link back to an
+    ancestor ends instead of looping forever, and a directory reachable
+    through several links is only walked once. That costs one stat per
+    directory (none per file), so with follow_links=False, where no loop
+    is possible, it is skipped.
+
+    Size and mtime bounds are checked on DirEntry.stat(), only for the
+    files whose name passed is_match. On Windows that stat comes with the
+    directory listing; elsewhere it is one call per candidate file. In
+    both cases it is cached on the yielded entry, so later stages (like
+    grouping by size in file_hashing.py) reuse it for free.
+
+    Args:
+      path(str): path of the file system
+      exclude(iterable of str): glob patterns ('.git', '*.tmp') of the
+        file and directory names to skip. Excluded directories are not
+        descended into.
+      max_depth(int): deepest level of subdirectories to descend into.
+        0 only lists path itself. None for no limit.
+      follow_links(bool): whether to descend into symlinked directories.
+        It only affects directories: a symlink to a file is yielded
+        either way, like find -P lists it.
+      is_match(callable): file name -> truthy when the file is wanted.
+        None yields every file.
+      stat_bounds: min_size, max_size, modified_after and modified_before,
+        as in make_stat_filter(). Bounds left out are not checked.
+
+    Yields:
+       os.DirEntry objects of files, in no particular order
+    """
+
+    if not os.path.isdir(path): # Checks path string
+      print("Invalid path.")
+      return
+
+    excluded = compile_globs(exclude)
+    wanted = make_stat_filter(**stat_bounds)
+    visited = None # (device, inode) of the directories walked so far
+    if follow_links:
+      root_stat = os.stat(path)
+      visited = {(root_stat.st_dev, root_stat.st_ino)}
+
+    pending_dirs = [(path, 0)] # Directories still to be scanned, and depth
+    while pending_dirs:
+      current_dir, depth = pending_dirs.pop()
+      descend = max_depth is None or depth < max_depth
+      try:
+        entries = os.scandir(current_dir)
+      except OSError: # Unreadable or vanished directory
+        continue
+      with entries:
+        for entry in entries:
+          if excluded is not None and excluded(entry.name):
+            continue
+          # DirEntry caches its type, so these checks cost no syscall on
+          # most file systems
+          if entry.is_dir(follow_symlinks=follow_links):
+            if not descend:
+              continue
+            if visited is not None:
+              try:
+                entry_stat = entry.stat()
+              except OSError: # Dangling or vanished meanwhile
+                continue
+              dir_id = (entry_stat.st_dev, entry_stat.st_ino)
+              if dir_id in visited: # Symlink loop or already walked
+                continue
+              visited.add(dir_id)
+            pending_dirs.append((entry.path, depth + 1))
+          elif entry.is_file():
+            if is_match is not None and not is_match(entry.name):
+              continue
+            if wanted is not None:
+              try:
+                if not wanted(entry.stat()):
+                  continue
+              except OSError: # Vanished meanwhile
+                continue
+            yield entry
+
+
+def iter_files(suffix, path, **walk_params):
+    """
+    Generator version of find_files(): yields the paths of the files
+    beneath path with file name suffix as soon as they are found.
+    See iter_file_entries() for how the tree is walked.
+
+    Args:
+      suffix(str): suffix if the file name to be found
+      path(str): path of the file system
+      walk_params: exclude, max_depth, follow_links and the size and
+                   mtime bounds, as in iter_file_entries()
+
+    Yields:
+       file paths, in no particular order
+    """
+
+    name_suffix = "." + suffix.strip(".") # Compared against the file names
+    for entry in iter_file_entries(path, is_match=lambda name: name.endswith(name_suffix),
+                                   **walk_params):
+      yield entry.path
+
+
+# Helper function: the text after the last dot of a file name ("" when
+# there is none)
+def name_extension(name):
+  dot = name.rfind(".")
+  return name[dot + 1:] if dot >= 0 else ""
+
+
+class Name_Matcher(object):
+  """
+  Precompiled matcher of file names against several patterns at once.
+
+  A pattern holding any of the GLOB_CHARS ('*.c', 'test_*', 'Makefile?')
+  is a glob matched against the whole file name, case-sensitively. Any
+  other pattern is a suffix, with or without its leading dot ('.c', 'h',
+  'tar.gz'), matched like in find_files().
+
+  Suffixes are filed by their last extension, so a name is only compared
+  against the suffixes sharing its extension. Globs are translated into
+  regular expressions and also joined into a single alternation that
+  rejects non-matching names in one call before each glob is tried.
+
+  Interface:
+    .match(name) - List of the patterns matching the file name.
+  """
+
+  def __init__(self, patterns):
+    self.patterns = list(dict.fromkeys(patterns)) # Unique, in order
+    self.suffixes = {} # Extension -> [(pattern, name suffix)]
+    self.globs = [] # [(pattern, compiled match)]
+    for pattern in self.patterns:
+      if any(char in pattern for char in GLOB_CHARS):
+        self.globs.append((pattern, re.compile(fnmatch.translate(pattern)).match))
+      else:
+        name_suffix = "." + pattern.strip(".")
+        self.suffixes.setdefault(name_extension(name_suffix), []).append(
+          (pattern, name_suffix))
+    self.any_glob = compile_globs(pattern for pattern, _ in self.globs)
+
+  def match(self, name):
+    matched = []
+    suffixes = self.suffixes.get(name_extension(name))
+    if suffixes is not None:
+      for pattern, name_suffix in suffixes:
+        if name.endswith(name_suffix):
+          matched.append(pattern)
+    if self.any_glob is not None and self.any_glob(name):
+      for pattern, match in self.globs:
+        if match(name):
+          matched.append(pattern)
+    return matched
+
+
+def iter_matches(patterns, path, **walk_params):
+  """
+  Walks the tree beneath path once and yields (pattern, file path) for
+  every pattern a file matches. See Name_Matcher for the pattern kinds
+  and iter_file_entries() for the walk_params.
+  """
+
+  matcher = patterns if isinstance(patterns, Name_Matcher) else Name_Matcher(patterns)
+  # The walk only stats (for size or mtime bounds) the files that matched
+  for entry in iter_file_entries(path, is_match=matcher.match, **walk_params):
+    for pattern in matcher.match(entry.name):
+      yield pattern, entry.path
+
+
+def find_files_grouped(patterns, path, **walk_params):
+  """
+  Find the files beneath path matching any of several suffixes or glob
+  patterns, in a single walk of the tree.
+
+  Args:
+    patterns(iterable of str): suffixes ('.c', 'h') and/or globs ('*.py')
+    path(str): path of the file system
+    walk_params: exclude, max_depth, follow_links and the size and
+                 mtime bounds, as in iter_file_entries()
+
+  Returns:
+     a dict mapping every pattern to the set of paths it matched
+  """
+
+  matcher = Name_Matcher(patterns)
+  found_files = {pattern: set() for pattern in matcher.patterns}
+  for pattern, file_path in iter_matches(matcher, path, **walk_params):
+    found_files[pattern].add(file_path)
+  return found_files
+
 
 # Helper function to print the test results
 def print_result(result, description):
@@ -57,25 +284,140 @@ def print_result(result, description):
     print(item)
 
 
-description = "# Test Case 1: Testing the problem giving example"
-result = find_files(".c", ".\\2_Project\\P2 File Recursion\\testdir")
-print_result(result, description)
+if __name__ == "__main__":
+
+  import shutil
+  import tempfile
+
+  # Test trees live next to this script, whatever the working directory
+  script_dir = os.path.dirname(os.path.abspath(__file__))
+
+  description = "# Test Case 1: Testing the problem giving example"
+  result = find_files(".c", os.path.join(script_dir, "testdir"))
+  print_result(sorted(result), description)
+
+  description = "# Test Case 2: Other example"
+  result = find_files(".c", os.path.join(script_dir, "testdir2"))
+  print_result(sorted(result), description)
+
+  description = "# Test Case 2:Very deep file extrucute"
+  result = find_files(".c", os.path.join(script_dir, "testdir3"))
+  print_result(sorted(result), description)
+
+  # git does not keep empty directories, so this one is made on the fly
+  empty_dir = tempfile.mkdtemp()
+  description = "# Test Case 4: Empty directory"
+  result = find_files(".c", empty_dir)
+  print_result(sorted(result), description)
+  print("Nothing expected.")
+  print("\n\n")
+  os.rmdir(empty_dir)
+
+  print("# Test Case 5: Invalid path string. Directory does not exist.")
+  result = find_files(".c", os.path.join(script_dir, "testdir5"))
+  print("Error message expected.")
+  print("\n\n")
+
+  description = "# Test Case 6: Streaming generator over the example tree"
+  result = sorted(iter_files(".c", os.path.join(script_dir, "testdir")))
+  print_result(result, description)
+  print("The same 4 .c files expected, found without recursion.")
+  print("\n\n")
+
+  description = "# Test Case 7: Streaming generator over a very deep tree"
+  result = iter_files("c", os.path.join(script_dir, "testdir3"))
+  print_result(result, description)
+  print("\n\n")
+
+  description = "# Test Case 8: Suffixes and globs in a single walk"
+  print("\n\n")
+  print(description)
+  result = find_files_grouped([".c", "h", "[ab].c", "t1.*"],
+                              os.path.join(script_dir, "testdir"))
+  for pattern, paths in result.items():
+    print_result(sorted(os.path.relpath(item, script_dir) for item in paths),
+                 "Pattern '{}'".format(pattern))
+  # Expected to see every .c file under both ".c" and "[ab].c" unless it
+  # is t1.c, which also shows up under "t1.*" with t1.h.
+  print("\n\n")
+
+  work_dir = tempfile.mkdtemp()
+  tree = os.path.join(work_dir, "tree")
+  shutil.copytree(os.path.join(script_dir, "testdir"), tree)
+  os.makedirs(os.path.join(tree, ".git", "objects"))
+  open(os.path.join(tree, ".git", "objects", "packed.c"), "w").close()
+
+  description = "# Test Case 9: Excluded directories are pruned"
+  result = sorted(os.path.relpath(item, tree) for item in
+                  iter_files(".c", tree, exclude=[".git", "subdir3"]))
+  print_result(result, description)
+  # Expected to see neither .git/objects/packed.c nor the files of subdir3.
+  print("\n\n")
+
+  description = "# Test Case 10: Depth limit"
+  result = sorted(os.path.relpath(item, tree) for item in
+                  iter_files(".c", tree, max_depth=1))
+  print_result(result, description)
+  # Expected to see t1.c and the .c files one level down, but not
+  # subdir3/subsubdir1/b.c nor .git/objects/packed.c.
+  print("\n\n")
+
+  description = "# Test Case 11: Symlink loop"
+  try:
+    os.symlink(tree, os.path.join(tree, "subdir1", "loop"))
+  except (OSError, NotImplementedError): # No symlink support
+    print(description)
+    print("Symlinks not supported here.")
+  else:
+    result = sorted(os.path.relpath(item, tree) for item in
+                    iter_files(".h", tree, exclude=[".git"]))
+    print_result(result, description)
+    # Expected to see each .h file once: the link back to the root is
+    # detected and not walked.
+  print("\n\n")
 
-description = "# Test Case 2: Other example"
-result = find_files(".c", ".\\2_Project\\P2 File Recursion\\testdir2")
-print_result(result, description)
+  description = "# Test Case 12: Size and mtime filters"
+  with open(os.path.join(tree, "big.c"), "w") as big_file:
+    big_file.write("int x;\n" * 100)
+  os.utime(os.path.join(tree, "t1.c"), (0, 0)) # Last modified in 1970
+  result = sorted(os.path.relpath(item, tree) for item in
+                  iter_files(".c", tree, exclude=[".git"], min_size=1))
+  print_result(result, description + ", non-empty")
+  result = sorted(os.path.relpath(item, tree) for item in
+                  iter_files(".c", tree, exclude=[".git"], modified_before=1))
+  print_result(result, description + ", older than 1970-01-01 00:00:01")
+  # Expected to see big.c (every other test file is empty), then t1.c.
+  print("\n\n")
 
-description = "# Test Case 2:Very deep file extrucute"
-result = find_files(".c", ".\\2_Project\\P2 File Recursion\\testdir3")
-print_result(result, description)
+  description = "# Test Case 13: Symlinked files without following links"
+  try:
+    os.symlink(os.path.join(tree, "t1.c"), os.path.join(tree, "subdir2", "link.c"))
+  except (OSError, NotImplementedError): # No symlink support
+    print(description)
+    print("Symlinks not supported here.")
+  else:
+    result = sorted(os.path.relpath(item, tree) for item in
+                    iter_files(".c", tree, exclude=[".git"], follow_links=False))
+    print_result(result, description)
+    # Expected to see subdir2/link.c along with the other .c files, but
+    # nothing through the subdir1/loop link back to the root.
+  print("\n\n")
 
-description = "# Test Case 4: Empty directory"
-result = find_files(".c", ".\\2_Project\\P2 File Recursion\\testdir4")
-print_result(result, description)
-print("Nothing expected.")
-print("\n\n")
+  print("# Test Case 14: Command line -P against find -P")
+  if shutil.which("find") is None or not os.path.islink(os.path.join(tree, "subdir2", "link.c")):
+    print("find or symlinks not available here.")
+  else:
+    import subprocess
+    import sys
+    expected = subprocess.run(["find", "-P", tree, "-name", "*.c"], check=True,
+                              stdout=subprocess.PIPE).stdout.splitlines()
+    cli_path = os.path.join(script_dir, "find_files_cli.py")
+    for jobs in ("1", "3"):
+      found = subprocess.run([sys.executable, cli_path, "-P", "-s", ".c", "-j", jobs, tree],
+                             check=True, stdout=subprocess.PIPE).stdout.splitlines()
+      print("-j {}: same files as find -P: {}".format(jobs, sorted(found) == sorted(expected)))
+  # Expected to see True twice: subdir2/link.c is listed, the subdir1/loop
+  # link is not descended into.
+  print("\n\n")
 
-print("# Test Case 5: Invalid path string. Directory does not exist.")
-result = find_files(".c", ".\\2_Project\\P2 File Recursion\\testdir5")
-print("Error message expected.")
-print("\n\n")
+  shutil.rmtree(work_dir)
@@ -0,0 +1,244 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #2 - File Recursion - Persistent suffix index
+
+import os
+import pickle
+import time
+
+from problem_2 import name_extension
+
+# Script Params
+INDEX_VERSION = 2
+# A directory modified this close to the scan may change again within the
+# same mtime tick; its listing is not trusted on the next refresh
+RACY_SECONDS = 2.0
+
+
+class Suffix_Index(object):
+  """
+  On-disk index of the files beneath a root directory, by suffix.
+
+  For every directory the index keeps its mtime, its file names and its
+  subdirectory names. A directory's mtime changes whenever an entry is
+  added, removed or renamed in it, so refresh() only lists the
+  directories whose mtime changed since the last refresh and reuses
+  the recorded listing of all the others: one stat per directory
+  instead of one listing per directory plus one check per entry.
+  Directories that disappeared are dropped along with their files, and
+  new ones are scanned from scratch.
+
+  File names are also kept by extension and directory, and that map is
+  saved with the index, so loading it is a single unpickle and a query
+  only joins the paths of the matching files.
+
+  Interface:
+    .refresh() - Brings the index up to date. Returns a dict with the
+                 scanned, reused and removed directory counts.
+    .find(suffix) - Set of file paths with file name suffix.
+    .save(index_path) / Suffix_Index.load(index_path, root)
+  """
+
+  def __init__(self, root):
+    self.root = root
+    # Directory path -> (mtime_ns or None, file names, subdirectory names)
+    self.dirs = {}
+    # File name extension -> {directory path: file names}
+    self.by_extension = {}
+
+  def refresh(self):
+    if not os.path.isdir(self.root): # Checks path string
+      print("Invalid path.")
+      return {"scanned": 0, "reused": 0, "removed": len(self.dirs)}
+
+    old_dirs = self.dirs
+    new_dirs = {}
+    scanned = reused = 0
+    now_ns = time.time_ns()
+    racy_ns = int(RACY_SECONDS * 1e9)
+
+    # (device, inode) of the directories walked so far: as in
+    # iter_file_entries(), a symlink back to an ancestor or a directory
+    # reachable through several links is only walked once
+    visited = set()
+    pending_dirs = [self.root]
+    while pending_dirs:
+      directory = pending_dirs.pop()
+      try:
+        dir_stat = os.stat(directory)
+      except OSError: # Vanished meanwhile
+        continue
+      dir_id = (dir_stat.st_dev, dir_stat.st_ino)
+      if dir_id in visited: # Reached twice through symlinks
+        continue
+      visited.add(dir_id)
+      mtime_ns = dir_stat.st_mtime_ns
+      record = old_dirs.get(directory)
+      if record is not None and record[0] == mtime_ns:
+        reused += 1
+      else:
+        record = self.scan(directory, mtime_ns, now_ns - mtime_ns < racy_ns)
+        if record is None:
+          continue
+        scanned += 1
+        if directory in old_dirs:
+          self.remove_files(directory, old_dirs[directory][1])
+        self.add_files(directory, record[1])
+      new_dirs[directory] = record
+      # Unchanged directories may still hide changed subdirectories
+      for name in record[2]:
+        pending_dirs.append(os.path.join(directory, name))
+
+    removed = 0
+    for directory, record in old_dirs.items():
+      if directory not in new_dirs: # Deleted (or no longer reachable)
+        self.remove_files(directory, record[1])
+        removed += 1
+    self.dirs = new_dirs
+    return {"scanned": scanned, "reused": reused, "removed": removed}
+
+  def find(self, suffix):
+    name_suffix = "." + suffix.strip(".")
+    found_files = set()
+    # Only the directories holding files with that extension are visited
+    for directory, names in self.by_extension.get(name_extension(name_suffix), {}).items():
+      for name in names:
+        if name.endswith(name_suffix): # "tar.gz" is indexed under "gz"
+          found_files.add(os.path.join(directory, name))
+    return found_files
+
+  # Helper method
+  def scan(self, directory, mtime_ns, racy):
+    files, subdirs = [], []
+    try:
+      with os.scandir(directory) as entries:
+        for entry in entries:
+          if entry.is_dir():
+            subdirs.append(entry.name)
+          elif entry.is_file():
+            files.append(entry.name)
+    except OSError: # Unreadable or vanished directory
+      return None
+    # A racy listing is stored without mtime, so it is listed again
+    return (None if racy else mtime_ns, tuple(files), tuple(subdirs))
+
+  # Helper method
+  def add_files(self, directory, names):
+    for name in names:
+      self.by_extension.setdefault(name_extension(name), {}).setdefault(
+        directory, []).append(name)
+
+  # Helper method
+  def remove_files(self, directory, names):
+    for extension in {name_extension(name) for name in names}:
+      directories = self.by_extension.get(extension)
+      if directories is not None:
+        directories.pop(directory, None)
+        if not directories:
+          del self.by_extension[extension]
+
+  def save(self, index_path):
+    # Written aside and renamed: a crash never leaves a broken index
+    temporary_path = "{}.tmp".format(index_path)
+    with open(temporary_path, "wb") as index_file:
+      pickle.dump((INDEX_VERSION, self.root, self.dirs, self.by_extension),
+                  index_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, index_path)
+
+  @classmethod
+  def load(cls, index_path, root):
+    """
+    Loads a saved index of root. A missing, unreadable or foreign index
+    file gives an empty index (the next refresh scans everything).
+    """
+    index = cls(root)
+    try:
+      with open(index_path, "rb") as index_file:
+        version, saved_root, dirs, by_extension = pickle.load(index_file)
+    except (OSError, ValueError, TypeError, EOFError, pickle.UnpicklingError):
+      return index
+    if version != INDEX_VERSION or saved_root != root:
+      return index
+    index.dirs = dirs
+    index.by_extension = by_extension
+    return index
+
+
+def find_files_indexed(suffix, path, index_path):
+  """
+  find_files() backed by a Suffix_Index saved at index_path: loads it,
+  refreshes the directories that changed, saves it back and answers
+  from the index.
+
+  Returns:
+     a set of paths, the same ones iter_files() yields
+  """
+  index = Suffix_Index.load(index_path, path)
+  index.refresh()
+  index.save(index_path)
+  return index.find(suffix)
+
+
+if __name__ == "__main__":
+
+  import shutil
+  import tempfile
+
+  work_dir = tempfile.mkdtemp()
+  tree = os.path.join(work_dir, "tree")
+  index_path = os.path.join(work_dir, "tree.index")
+  script_dir = os.path.dirname(os.path.abspath(__file__))
+  shutil.copytree(os.path.join(script_dir, "testdir"), tree)
+
+  print("\n\n")
+  print("# Test Case 1: First run builds the whole index")
+  index = Suffix_Index.load(index_path, tree)
+  print(index.refresh())
+  index.save(index_path)
+  print(sorted(os.path.relpath(item, tree) for item in index.find(".c")))
+  # Expected to see every directory scanned and the 4 .c files.
+
+  # Waits until the listings above are no longer racy
+  time.sleep(RACY_SECONDS)
+  index = Suffix_Index.load(index_path, tree)
+  index.refresh()
+  index.save(index_path)
+
+  print("\n\n")
+  print("# Test Case 2: Nothing changed")
+  index = Suffix_Index.load(index_path, tree)
+  print(index.refresh())
+  # Expected to see 0 directories scanned, all of them reused.
+
+  print("\n\n")
+  print("# Test Case 3: A file added, a subdirectory deleted, another added")
+  open(os.path.join(tree, "subdir2", "new.c"), "w").close()
+  shutil.rmtree(os.path.join(tree, "subdir3"))
+  os.makedirs(os.path.join(tree, "subdir6"))
+  open(os.path.join(tree, "subdir6", "other.c"), "w").close()
+  print(index.refresh())
+  print(sorted(os.path.relpath(item, tree) for item in index.find(".c")))
+  # Expected to see 3 directories scanned (root, subdir2 and the new
+  # subdir6), 2 removed (subdir3 and subsubdir1), and the .c files of
+  # subdir3 replaced by subdir2/new.c and subdir6/other.c.
+
+  print("\n\n")
+  print("# Test Case 4: Same answer as a full walk")
+  from problem_2 import iter_files
+  print(find_files_indexed(".h", tree, index_path) == set(iter_files(".h", tree)))
+  # Expected to see True.
+
+  print("\n\n")
+  print("# Test Case 5: Symlinks back to the root")
+  try:
+    os.symlink(tree, os.path.join(tree, "subdir1", "loop"))
+    os.symlink(tree, os.path.join(tree, "subdir2", "loop"))
+  except (OSError, NotImplementedError): # No symlink support
+    print("Symlinks not supported here.")
+  else:
+    result = find_files_indexed(".c", tree, index_path)
+    print(result == set(iter_files(".c", tree)), len(result))
+    # Expected to see True 5: the links lead to directories already
+    # walked, so they are not walked again.
+
+  shutil.rmtree(work_dir)
@@ -0,0 +1,304 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Adaptive (FGK) coding
+
+from problem_3 import BYTE_BITS, Bit_Reader, Bit_Stream, Bit_Writer
+
+# Script Params
+# A symbol seen for the first time is sent as the code of the NYT ("not
+# yet transmitted") leaf followed by its UTF-8 bytes, 8 bits each.
+# UTF-8 lead byte -> number of bytes of the symbol
+UTF8_LENGTHS = [1] * 0x80 + [0] * 0x40 + [2] * 0x20 + [3] * 0x10 + [4] * 0x08 + [0] * 0x08
+
+
+class Adaptive_Huffman_Tree:
+    '''
+    Adaptive Huffman tree of the FGK algorithm (Faller, Gallager, Knuth,
+    as given by Vitter), shared by the encoder and the decoder: both
+    start from the same empty tree and update it after every symbol, so
+    the codes follow the frequencies seen so far and no table is ever
+    sent.
+    The nodes live in parallel lists indexed by their position in the
+    sibling order: the root at position 0, weights never increasing with
+    the position, siblings next to each other, and the NYT leaf always
+    last. Swapping two nodes swaps what is stored at their positions, so
+    the parents stay in place and an update is O(code length) plus the
+    scan for the first position of a weight.
+    Interface:
+        .code(char) - (code, length) of a known symbol, None if new.
+        .nyt_code() - (code, length) of the NYT leaf.
+        .update(char) - Counts one more char, adding it when new.
+    '''
+
+    def __init__(self):
+        # Position 0 is the NYT leaf, alone in the tree
+        self.weight = [0]
+        self.parent = [-1]
+        self.left = [-1] # -1 for leaves
+        self.right = [-1]
+        self.char = [None] # None for inner nodes and the NYT leaf
+        self.leaf_of = dict() # char -> position
+
+    def nyt(self):
+        return len(self.weight) - 1
+
+    def path_code(self, node):
+        # Code of the node: the branches from the root, read bottom up
+        parent, right = self.parent, self.right
+        code, length = 0, 0
+        while node:
+            up = parent[node]
+            if right[up] == node:
+                code |= 1 << length
+            length += 1
+            node = up
+        return code, length
+
+    def code(self, char):
+        node = self.leaf_of.get(char)
+        return None if node is None else self.path_code(node)
+
+    def nyt_code(self):
+        return self.path_code(self.nyt())
+
+    def swap(self, first, second):
+        # Exchanges the subtrees at two positions of the same weight
+        left, right, char = self.left, self.right, self.char
+        left[first], left[second] = left[second], left[first]
+        right[first], right[second] = right[second], right[first]
+        char[first], char[second] = char[second], char[first]
+        for node in (first, second):
+            if left[node] >= 0:
+                self.parent[left[node]] = self.parent[right[node]] = node
+            elif char[node] is not None:
+                self.leaf_of[char[node]] = node
+
+    def update(self, char):
+        weight, parent = self.weight, self.parent
+        node = self.leaf_of.get(char)
+        if node is None:
+            # The NYT leaf becomes an inner node, parent of the new leaf
+            # and of a new NYT leaf, in that order
+            node = self.nyt()
+            leaf = node + 1
+            self.left[node], self.right[node] = leaf + 1, leaf
+            for lists, value in ((weight, 0), (parent, node), (self.left, -1),
+                                 (self.right, -1)):
+                lists += (value, value)
+            self.char += (char, None)
+            self.leaf_of[char] = leaf
+            node = leaf
+
+        if node == self.nyt() - 1:
+            # Sibling of the NYT leaf: only swapped with the first leaf of
+            # its weight, never with its own parent (of the same weight)
+            first = node
+            while first > 0 and weight[first - 1] == weight[node]:
+                first -= 1
+            while self.left[first] >= 0:
+                first += 1
+            if first != node:
+                self.swap(first, node)
+                node = first
+            weight[node] += 1
+            node = parent[node]
+
+        while node > 0:
+            # Moves the node first in its weight block, then counts it
+            first = node
+            node_weight = weight[node]
+            while weight[first - 1] == node_weight:
+                first -= 1
+            if first != node:
+                self.swap(first, node)
+                node = first
+            weight[node] += 1
+            node = parent[node]
+        if node == 0:
+            weight[0] += 1
+
+
+class Adaptive_Encoder:
+    '''
+    Single-pass Huffman encoder: every symbol is written as soon as it is
+    given, with the codes of the frequencies seen so far, so a live stream
+    is encoded with no look-ahead and no header.
+    Interface:
+        .encode(data) - Encodes the symbols of a string.
+        .take_bytes() - The whole bytes written so far, for streaming.
+        .finish() - Pads the last byte, returns the Bit_Stream of what
+                    take_bytes() has not taken yet.
+    '''
+
+    def __init__(self, writer=None):
+        self.tree = Adaptive_Huffman_Tree()
+        self.writer = writer if writer is not None else Bit_Writer()
+        self.taken_bits = 0 # Bits already moved out by take_bytes()
+
+    def encode(self, data):
+        tree = self.tree
+        codes = []
+        for char in data:
+            code = tree.code(char)
+            if code is None:
+                codes.append(tree.nyt_code())
+                codes.extend((byte, 8) for byte in char.encode("utf-8", "surrogatepass"))
+            else:
+                codes.append(code)
+            tree.update(char)
+        self.writer.write_many(codes)
+
+    def take_bytes(self):
+        taken = self.writer.take_bytes()
+        self.taken_bits += len(taken) * 8
+        return taken
+
+    def finish(self):
+        stream = self.writer.finish()
+        # The writer counts every bit, the taken ones too
+        stream.bit_length -= self.taken_bits
+        self.taken_bits += stream.bit_length
+        return stream
+
+
+class Adaptive_Decoder:
+    '''
+    Decoder of the Adaptive_Encoder output, updating its own tree the
+    same way after every symbol. The state (the node reached, or the
+    bytes of a new symbol read so far) is kept between calls, so a stream
+    can be decoded in pieces of any size, as it arrives.
+    Interface:
+        .decode(data) - Decodes whole bytes, returns the symbols ended in them.
+        .finish(last_byte, bits) - Decodes the first bits of a last
+                                   partial byte, the end of the stream.
+        .decode_bits(bits) - Decodes an iterable of 0/1 bits.
+    All three raise ValueError on a bad new symbol, finish() also on a
+    last symbol cut short.
+    '''
+
+    def __init__(self):
+        self.tree = Adaptive_Huffman_Tree()
+        self.node = 0 # Position reached in the tree
+        self.literal = None # UTF-8 bytes of a new symbol, while read
+        self.literal_bits = 0 # Bits of the literal's last byte read so far
+
+    def decode(self, data):
+        return self.decode_bits(Bit_Reader(Bit_Stream(data, len(data) * 8)).bits())
+
+    def finish(self, last_byte, bits):
+        decoded_data = self.decode_bits(BYTE_BITS[last_byte][:bits])
+        truncated = self.node or self.literal is not None
+        self.node, self.literal, self.literal_bits = 0, None, 0
+        if truncated:
+            raise ValueError("Truncated adaptive Huffman data")
+        return decoded_data
+
+    def decode_bits(self, bits):
+        tree = self.tree
+        left, right, char = tree.left, tree.right, tree.char
+        decoded_chars = []
+        node, literal, literal_bits = self.node, self.literal, self.literal_bits
+        for bit in bits:
+            if literal is None and left[0] < 0:
+                # Empty tree: the first symbol is new, with no NYT code
+                literal, literal_bits = bytearray(1), 0
+            if literal is None:
+                node = right[node] if bit else left[node]
+                if left[node] >= 0: # Inner node
+                    continue
+                if node != tree.nyt():
+                    decoded_chars.append(char[node])
+                    tree.update(char[node])
+                    node = 0
+                    continue
+                literal, literal_bits = bytearray(1), 0
+                continue
+            # Reading the UTF-8 bytes of a new symbol
+            literal[-1] = (literal[-1] << 1) | bit
+            literal_bits += 1
+            if literal_bits < 8:
+                continue
+            literal_bits = 0
+            if not UTF8_LENGTHS[literal[0]]:
+                raise ValueError("Invalid new symbol in the adaptive Huffman data")
+            if len(literal) < UTF8_LENGTHS[literal[0]]:
+                literal.append(0)
+                continue
+            try:
+                new_char = literal.decode("utf-8", "surrogatepass")
+            except UnicodeDecodeError:
+                raise ValueError("Invalid new symbol in the adaptive Huffman data")
+            decoded_chars.append(new_char)
+            tree.update(new_char)
+            node, literal = 0, None
+        self.node, self.literal, self.literal_bits = node, literal, literal_bits
+        return "".join(decoded_chars)
+
+
+def adaptive_encoding(data):
+    '''
+    Encodes a whole string with an Adaptive_Encoder.
+    params:
+        data : original data string
+    result:
+        encoded_data : Bit_Stream, with no header and no tree to keep
+    '''
+    encoder = Adaptive_Encoder()
+    encoder.encode(data)
+    return encoder.finish()
+
+
+def adaptive_decoding(encoded_data):
+    '''
+    Decodes a whole adaptive_encoding() Bit_Stream.
+    params:
+        encoded_data : Bit_Stream
+    result:
+        decoded_data : original data string
+    Raises ValueError if encoded_data is not valid.
+    '''
+    decoder = Adaptive_Decoder()
+    full_bytes = encoded_data.bit_length >> 3
+    decoded_data = decoder.decode(encoded_data.data[:full_bytes])
+    # The bits of the last byte that are not padding
+    tail_bits = encoded_data.bit_length & 7
+    if tail_bits:
+        decoded_data += decoder.finish(encoded_data.data[full_bytes], tail_bits)
+    elif decoder.node or decoder.literal is not None:
+        raise ValueError("Truncated adaptive Huffman data")
+    return decoded_data
+
+
+if __name__ == "__main__":
+
+    print("\n\n")
+    print("# Test Case 1: Round trip")
+    a_great_sentence = "The bird is the word"
+    encoded_data = adaptive_encoding(a_great_sentence)
+    print(adaptive_decoding(encoded_data))
+    print("{} bits, no header".format(encoded_data.bit_length))
+    # Expected to see the sentence back in 164 bits: the 12 distinct
+    # symbols as 8-bit literals after their NYT codes, the repeats coded.
+
+    print("\n\n")
+    print("# Test Case 2: A live stream, sent and decoded piece by piece")
+    encoder, decoder = Adaptive_Encoder(), Adaptive_Decoder()
+    received = []
+    for message in ("línea uno\n", "línea dos ☃\n", "línea tres\n"):
+        encoder.encode(message)
+        received.append(decoder.decode(encoder.take_bytes()))
+    last = encoder.finish() # Only the bits held back, at most 7
+    received.append(decoder.finish(last.data[0], last.bit_length) if last.data else "")
+    print(received)
+    # Expected to see every line decoded as soon as its bytes are sent,
+    # but for the up to 7 bits held back until the next piece.
+
+    print("\n\n")
+    print("# Test Case 3: Empty, one symbol, and truncated data")
+    print(repr(adaptive_decoding(adaptive_encoding(""))),
+          adaptive_decoding(adaptive_encoding("bbbb")))
+    try:
+        adaptive_decoding(Bit_Stream(b"\xc3", 8))
+    except ValueError as error:
+        print(error)
+    # Expected to see '' bbbb and an error message.
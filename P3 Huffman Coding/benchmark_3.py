@@ -0,0 +1,417 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Benchmarks
+#
+# Usage: python benchmark_3.py [section ...]
+# With no arguments every section is run.
+
+import os
+import random
+import sys
+import time
+
+from adaptive_huffman import adaptive_decoding, adaptive_encoding
+from canonical_huffman import canonical_decoding, canonical_encoding
+from huffman_blocks import Block_Container, compress_blocks, decompress_blocks
+from huffman_table_cache import Code_Table_Cache, train_code_table
+from huffman_stream import compress_file, decompress_file
+from problem_3 import (Bit_Reader, Bit_Writer, Root_Table_Decoder, Table_Decoder,
+                       build_code_strings, build_code_table,
+                       build_huffman_tree, build_huffman_tree_sorted,
+                       byte_frequencies, encode_bytes,
+                       encode_symbols, huffman_decoding, huffman_encoding, numpy,
+                       table_decoding, tree_decoding)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_text(size, seed=1):
+    '''
+    English-like test text of about size characters: words drawn with a
+    skewed (Zipf-like) distribution from a fixed vocabulary, some
+    punctuation and line breaks.
+    '''
+    generator = random.Random(seed)
+    vocabulary = ("the of and to in is that for it as was with be by on not he "
+                  "this are or his from at which but have an they you were her "
+                  "she there been one all we their has would when if so no will "
+                  "data structure tree node heap queue cache file code bits "
+                  "compression huffman frequency symbol decoder encoder").split()
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    words = []
+    length = 0
+    while length < size:
+        batch = generator.choices(vocabulary, weights, k=1000)
+        for index in range(0, len(batch), 12):
+            batch[index] = batch[index].capitalize()
+            batch[index - 1] += "." if index % 48 else ".\n"
+        words.extend(batch)
+        length += sum(len(word) + 1 for word in batch)
+    return " ".join(words)[:size]
+
+
+def make_inputs(size=1 << 20):
+    '''
+    Named test inputs of about size characters each: natural-ish text,
+    this project's own source code, and uniformly random printable text
+    (nearly incompressible by Huffman coding).
+    '''
+    with open(os.path.join(SCRIPT_DIR, "problem_3.py")) as source_file:
+        source = source_file.read()
+    generator = random.Random(2)
+    printable = [chr(code) for code in range(32, 127)]
+    return {
+        "english-like": make_text(size),
+        "source code": (source * (size // len(source) + 1))[:size],
+        "random printable": "".join(generator.choices(printable, k=size)),
+    }
+
+
+def bench_roundtrip(size=1 << 20):
+    '''
+    Encodes and decodes every input: the sizes of the original (UTF-8),
+    of the bit-packed output and of the former one-char-per-bit string,
+    the compression ratio and the time of each direction.
+    '''
+    print("\n# Round trip, {:,} characters per input".format(size))
+    print("{:>17} {:>10} {:>10} {:>12} {:>7} {:>9} {:>9}".format(
+        "input", "original", "encoded", "'0'/'1' str", "ratio", "encode s", "decode s"))
+    for name, text in make_inputs(size).items():
+        original = len(text.encode("utf-8"))
+        start = time.perf_counter()
+        encoded, tree = huffman_encoding(text)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = huffman_decoding(encoded, tree)
+        decode_time = time.perf_counter() - start
+        assert decoded == text
+        # The former format: one str character (one byte) per bit
+        bit_string = sys.getsizeof("0" * encoded.bit_length)
+        print("{:>17} {:>10,} {:>10,} {:>12,} {:>7.3f} {:>9.3f} {:>9.3f}".format(
+            name, original, len(encoded.data), bit_string, len(encoded.data) / original,
+            encode_time, decode_time))
+
+
+def decode_with(decoder, encoded):
+    '''Decodes a whole Bit_Stream with the given (new) decoder object.'''
+    full_bytes, tail_bits = encoded.bit_length >> 3, encoded.bit_length & 7
+    decoded = decoder.decode(encoded.data[:full_bytes])
+    return decoded + decoder.finish(encoded.data[full_bytes] if tail_bits else 0, tail_bits)
+
+
+def bench_decode(size=4 << 20, cjk_size=200000, cjk_alphabets=(3000, 8000),
+                 short_repeats=2000):
+    '''
+    Decoding: the bit by bit tree walk against the byte automaton
+    (Table_Decoder), the bounded root table (Root_Table_Decoder) and
+    table_decoding(), which picks one of the two (new_decoder()). Table
+    builds included. Inputs: multi-MB texts of at most 95 symbols, CJK
+    text over large alphabets (Zipf-like), and one short message,
+    decoded short_repeats times (time per message).
+    '''
+    inputs = make_inputs(size)
+    for alphabet_size in cjk_alphabets:
+        generator = random.Random(alphabet_size)
+        alphabet = [chr(0x4E00 + index) for index in range(alphabet_size)]
+        weights = [1.0 / (rank + 1) for rank in range(alphabet_size)]
+        inputs["cjk {:,} symbols".format(alphabet_size)] = "".join(
+            generator.choices(alphabet, weights, k=cjk_size))
+    inputs["short message"] = "sensor=81;temp=24.9;status=ok\n"
+
+    print("\n# Decoding, {:,} characters per text, {:,} per CJK text".format(size, cjk_size))
+    print("{:>20} {:>12} {:>12} {:>9}".format("input", "decoder", "seconds", "speed-up"))
+    for name, text in inputs.items():
+        encoded, tree = huffman_encoding(text)
+        repeats = short_repeats if len(text) < 1000 else 1
+        decoders = (("tree walk", lambda: tree_decoding(Bit_Reader(encoded).bits(), tree)),
+                    ("automaton", lambda: decode_with(Table_Decoder(tree), encoded)),
+                    ("root table", lambda: decode_with(Root_Table_Decoder(tree), encoded)),
+                    ("picked", lambda: table_decoding(encoded, tree)))
+        walk_time = None
+        for decoder_name, decode in decoders:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                assert decode() == text
+            elapsed = (time.perf_counter() - start) / repeats
+            if walk_time is None:
+                walk_time = elapsed
+            print("{:>20} {:>12} {:>12.6f} {:>9.2f}".format(
+                name if walk_time == elapsed else "", decoder_name, elapsed,
+                walk_time / elapsed))
+
+
+def bench_stream(sizes=(2 << 20, 8 << 20), chunk_size=1 << 18):
+    '''
+    Streaming file compression and decompression at growing file sizes:
+    throughput, and peak Python memory (tracemalloc) against the in
+    memory huffman_encoding() of the same text, which must hold it all.
+    '''
+    import shutil
+    import tempfile
+    import tracemalloc
+    root = tempfile.mkdtemp()
+    try:
+        print("\n# Streaming files, {:,} character chunks".format(chunk_size))
+        print("{:>12} {:>10} {:>11} {:>14} {:>14}".format(
+            "file MB", "pack MB/s", "unpack MB/s", "stream peak MB", "in memory MB"))
+        for size in sizes:
+            text_path = os.path.join(root, "input.txt")
+            with open(text_path, "w") as text_file:
+                text_file.write(make_text(size))
+            megabytes = os.path.getsize(text_path) / (1 << 20)
+
+            start = time.perf_counter()
+            compress_file(text_path, os.path.join(root, "input.huf"), chunk_size=chunk_size)
+            pack_time = time.perf_counter() - start
+            start = time.perf_counter()
+            decompress_file(os.path.join(root, "input.huf"), os.path.join(root, "output.txt"),
+                            chunk_size=chunk_size)
+            unpack_time = time.perf_counter() - start
+            with open(text_path) as text_file:
+                with open(os.path.join(root, "output.txt")) as output_file:
+                    assert text_file.read() == output_file.read()
+
+            tracemalloc.start()
+            compress_file(text_path, os.path.join(root, "input.huf"), chunk_size=chunk_size)
+            decompress_file(os.path.join(root, "input.huf"), os.path.join(root, "output.txt"),
+                            chunk_size=chunk_size)
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            with open(text_path) as text_file:
+                encoded, tree = huffman_encoding(text_file.read())
+            del encoded, tree
+            memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print("{:>12.1f} {:>10.1f} {:>11.1f} {:>14.1f} {:>14.1f}".format(
+                megabytes, megabytes / pack_time, megabytes / unpack_time,
+                stream_peak / (1 << 20), memory_peak / (1 << 20)))
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_blocks(size=8 << 20, block_size=1 << 20, worker_counts=(1, 2, 4)):
+    '''
+    Block container against one canonical_encoding() of the whole input:
+    compressed size with per-block and shared tables, encode and decode
+    time at several process counts, and random access to one block.
+    '''
+    text = make_text(size)
+    print("\n# Blocks: {:,} characters, {:,} per block, {} CPUs".format(
+        size, block_size, os.cpu_count()))
+    print("{:>24} {:>10} {:>10} {:>10}".format("mode", "bytes", "encode s", "decode s"))
+
+    start = time.perf_counter()
+    whole = canonical_encoding(text)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert canonical_decoding(whole) == text
+    print("{:>24} {:>10,} {:>10.3f} {:>10.3f}".format(
+        "single stream", len(whole), encode_time, time.perf_counter() - start))
+
+    for shared_table in (False, True):
+        for workers in worker_counts:
+            start = time.perf_counter()
+            container = compress_blocks(text, block_size, workers, shared_table)
+            encode_time = time.perf_counter() - start
+            start = time.perf_counter()
+            assert decompress_blocks(container, workers) == text
+            print("{:>24} {:>10,} {:>10.3f} {:>10.3f}".format(
+                "{} tables, {} workers".format("shared" if shared_table else "own", workers),
+                len(container), encode_time, time.perf_counter() - start))
+
+    blocks = Block_Container(container)
+    start = time.perf_counter()
+    block_index, offset = blocks.block_of(size // 2)
+    assert blocks.read_block(block_index)[offset] == text[size // 2]
+    print("random access to 1 of {} blocks: {:.3f} s".format(
+        blocks.block_count(), time.perf_counter() - start))
+
+
+def bench_bytes(size=4 << 20):
+    '''
+    bytes inputs: the generic per-symbol path (dict counting loop and
+    dict code lookups, run on the same data as a latin-1 str) against the
+    bytes fast path (byte_frequencies() and encode_bytes()), counting and
+    encoding timed apart.
+    '''
+    print("\n# bytes fast path, {:,} bytes per input, NumPy {}".format(
+        size, "available" if numpy is not None else "not installed"))
+    print("{:>17} {:>8} {:>10} {:>10} {:>10} {:>9}".format(
+        "input", "path", "count s", "encode s", "total s", "speed-up"))
+    inputs = {"english-like": make_text(size).encode("latin-1", "replace"),
+              "random bytes": os.urandom(size)}
+    for name, data in inputs.items():
+        text = data.decode("latin-1")
+
+        start = time.perf_counter()
+        char_frequency = dict()
+        for char in text:
+            char_frequency[char] = char_frequency.get(char, 0) + 1
+        count_time = time.perf_counter() - start
+        code_table = build_code_table(build_huffman_tree(char_frequency))
+        start = time.perf_counter()
+        writer = Bit_Writer()
+        encode_symbols(text, build_code_strings(code_table), writer)
+        generic = writer.finish()
+        encode_time = time.perf_counter() - start
+        generic_time = count_time + encode_time
+        print("{:>17} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>9.2f}".format(
+            name, "generic", count_time, encode_time, generic_time, 1.0))
+
+        start = time.perf_counter()
+        counts = byte_frequencies(data)
+        count_time = time.perf_counter() - start
+        byte_codes = [""] * 256
+        for char, (code, length) in code_table.items():
+            byte_codes[ord(char)] = format(code, "0{}b".format(length))
+        start = time.perf_counter()
+        writer = Bit_Writer()
+        encode_bytes(data, byte_codes, writer)
+        fast = writer.finish()
+        encode_time = time.perf_counter() - start
+        assert fast == generic and counts[data[0]] == char_frequency[text[0]]
+        print("{:>17} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>9.2f}".format(
+            "", "bytes", count_time, encode_time, count_time + encode_time,
+            generic_time / (count_time + encode_time)))
+
+        encoded, tree = huffman_encoding(data)
+        assert huffman_decoding(encoded, tree) == data
+
+
+def bench_adaptive(size=1 << 18):
+    '''
+    Single-pass adaptive (FGK) coding against the static two-pass path
+    (canonical_encoding(), whose output carries its code table): encoded
+    size with everything needed to decode, ratio to the UTF-8 original and
+    throughput of each direction.
+    '''
+    print("\n# Adaptive against static, {:,} characters per input".format(size))
+    print("{:>17} {:>9} {:>10} {:>7} {:>11} {:>11}".format(
+        "input", "coder", "bytes", "ratio", "enc MB/s", "dec MB/s"))
+    for name, text in make_inputs(size).items():
+        megabytes = len(text.encode("utf-8")) / (1 << 20)
+        coders = (("static", canonical_encoding, canonical_decoding, len),
+                  ("adaptive", adaptive_encoding, adaptive_decoding,
+                   lambda encoded: len(encoded.data)))
+        for coder_name, encode, decode, encoded_size in coders:
+            start = time.perf_counter()
+            encoded = encode(text)
+            encode_time = time.perf_counter() - start
+            start = time.perf_counter()
+            assert decode(encoded) == text
+            decode_time = time.perf_counter() - start
+            print("{:>17} {:>9} {:>10,} {:>7.3f} {:>11.2f} {:>11.2f}".format(
+                name if coder_name == "static" else "", coder_name, encoded_size(encoded),
+                encoded_size(encoded) / len(text.encode("utf-8")),
+                megabytes / encode_time, megabytes / decode_time))
+
+
+def bench_table_cache(count=20000, seed=4):
+    '''
+    Many small similar messages (telemetry-like lines): huffman_encoding()
+    building a tree per message, against a code table trained once on a
+    sample of 1,000 other messages and against the LRU Code_Table_Cache.
+    Encode and decode time per message and total encoded bits (with no
+    tree or table counted, per message they would cost more than the
+    message).
+    '''
+    generator = random.Random(seed)
+    def message():
+        return "sensor={};temp={:.1f};status={}\n".format(
+            generator.randrange(100), generator.uniform(10, 40),
+            generator.choice(("ok", "ok", "ok", "warn", "fail")))
+    sample = [message() for _ in range(1000)]
+    messages = [message() for _ in range(count)]
+    print("\n# Code table reuse, {:,} messages of ~{} characters".format(
+        count, sum(map(len, messages)) // count))
+    print("{:>14} {:>12} {:>12} {:>10} {:>14}".format(
+        "mode", "encode us", "decode us", "bits", "tables built"))
+
+    start = time.perf_counter()
+    encoded = [huffman_encoding(text) for text in messages]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert [huffman_decoding(*pair) for pair in encoded] == messages
+    decode_time = time.perf_counter() - start
+    print("{:>14} {:>12.1f} {:>12.1f} {:>10,} {:>14,}".format(
+        "tree each", encode_time / count * 1e6, decode_time / count * 1e6,
+        sum(pair[0].bit_length for pair in encoded), count))
+
+    start = time.perf_counter()
+    table = train_code_table(sample)
+    encoded = [table.encode(text) for text in messages]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert [table.decode(encoded_data) for encoded_data in encoded] == messages
+    decode_time = time.perf_counter() - start
+    print("{:>14} {:>12.1f} {:>12.1f} {:>10,} {:>14,}".format(
+        "trained", encode_time / count * 1e6, decode_time / count * 1e6,
+        sum(encoded_data.bit_length for encoded_data in encoded), 1))
+
+    cache = Code_Table_Cache()
+    start = time.perf_counter()
+    encoded = [cache.encode(text) for text in messages]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert [table.decode(encoded_data) for encoded_data, table in encoded] == messages
+    decode_time = time.perf_counter() - start
+    print("{:>14} {:>12.1f} {:>12.1f} {:>10,} {:>14,}".format(
+        "LRU cache", encode_time / count * 1e6, decode_time / count * 1e6,
+        sum(pair[0].bit_length for pair in encoded), cache.misses))
+
+
+def bench_tree(alphabet_sizes=(256, 4096, 20000, 65536), repeats=3):
+    '''
+    Huffman tree building for large alphabets (Zipf-like frequencies over
+    CJK code points): the heap build of build_huffman_tree() against
+    sorting the frequencies and building with two queues, with and
+    without the sort. Best of repeats runs.
+    '''
+    print("\n# Tree building, best of {}".format(repeats))
+    print("{:>9} {:>9} {:>14} {:>16}".format("symbols", "heap ms", "sort+queues ms",
+                                             "queues only ms"))
+    for alphabet_size in alphabet_sizes:
+        generator = random.Random(alphabet_size)
+        char_frequency = {chr(0x4E00 + index): 1000000 // (index + 1) + generator.randrange(3)
+                          for index in range(alphabet_size)}
+        items = list(char_frequency.items())
+        generator.shuffle(items)
+        char_frequency = dict(items)
+        timings = [float("inf")] * 3
+        for _ in range(repeats):
+            start = time.perf_counter()
+            heap_tree = build_huffman_tree(char_frequency)
+            timings[0] = min(timings[0], time.perf_counter() - start)
+            start = time.perf_counter()
+            sorted_frequencies = sorted(char_frequency.items(), key=lambda item: item[1])
+            sort_time = time.perf_counter() - start
+            queues_tree = build_huffman_tree_sorted(sorted_frequencies)
+            timings[1] = min(timings[1], time.perf_counter() - start)
+            timings[2] = min(timings[2], time.perf_counter() - start - sort_time)
+        # Both are optimal codes: the same encoded size
+        heap_table, queues_table = build_code_table(heap_tree), build_code_table(queues_tree)
+        assert (sum(count * heap_table[char][1] for char, count in char_frequency.items()) ==
+                sum(count * queues_table[char][1] for char, count in char_frequency.items()))
+        print("{:>9,} {:>9.2f} {:>14.2f} {:>16.2f}".format(
+            alphabet_size, *(timing * 1000 for timing in timings)))
+
+
+SECTIONS = {
+    "roundtrip": bench_roundtrip,
+    "decode": bench_decode,
+    "stream": bench_stream,
+    "blocks": bench_blocks,
+    "bytes": bench_bytes,
+    "tree": bench_tree,
+    "adaptive": bench_adaptive,
+    "cache": bench_table_cache,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(SECTIONS)
+    for name in selected:
+        SECTIONS[name]()
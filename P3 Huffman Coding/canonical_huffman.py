@@ -0,0 +1,298 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Canonical codes
+
+from collections import Counter
+
+from problem_3 import (Bit_Stream, Bit_Writer, Huffman_Tree, build_code_strings,
+                       build_code_table, build_huffman_tree, encode_symbols,
+                       table_decoding)
+
+# Script Params
+# Longest code allowed: every length fits a 4-bit header nibble. It
+# also bounds the depth of the rebuilt tree, so a code missing from the
+# decoder's root table (DECODE_TABLE_BITS in problem_3.py) is at most 5
+# tree walk steps away. The table sizes themselves depend on the table
+# bits (Root_Table_Decoder) or on the number of symbols (Table_Decoder),
+# not on this limit.
+MAX_CODE_LENGTH = 15
+
+# Compressed data layout:
+#   magic, version      - HEADER_MAGIC and HEADER_VERSION
+#   varint              - number of symbols n
+#   varint              - bit length of the payload
+#   n varints           - symbol code points, ascending, each one stored as
+#                         its distance to the previous one minus 1
+#   (n + 1) // 2 bytes  - code lengths (1 to 15) in the same order, two
+#                         4-bit nibbles per byte, high nibble first
+#   payload             - the codes, packed like a Bit_Stream
+# For English text that is about 1.5 bytes per distinct symbol.
+HEADER_MAGIC = b"CH"
+HEADER_VERSION = 1
+
+
+def code_lengths(tree):
+    '''
+    Code length of every symbol of a Huffman tree.
+    params:
+        tree : Huffman_Tree class object
+    result:
+        lengths : dict mapping every symbol to its code length
+    '''
+    return {char: length for char, (code, length) in build_code_table(tree).items()}
+
+
+def limit_code_lengths(lengths, max_length=MAX_CODE_LENGTH):
+    '''
+    Limits the code lengths to max_length bits, keeping a valid prefix
+    code. Longer codes are cut to max_length, which overflows the Kraft
+    sum (sum of 2^-length, at most 1 for a prefix code); then the longest
+    codes still shorter than max_length are made one bit longer until it
+    fits again. Lengthening the longest codes first moves the fewest bits
+    to the rarest symbols. The result is near optimal, not optimal (the
+    package-merge algorithm would be), which makes no practical
+    difference at 15 bits.
+    params:
+        lengths : dict mapping every symbol to its code length
+        max_length : longest code allowed
+    result:
+        limited : dict mapping every symbol to its new code length
+    Raises ValueError if there are more than 2^max_length symbols.
+    '''
+    if len(lengths) > 1 << max_length:
+        raise ValueError("{} symbols do not fit in {}-bit codes".format(
+            len(lengths), max_length))
+    limited = {char: min(length, max_length) for char, length in lengths.items()}
+    # Kraft sum scaled by 2^max_length, so all the terms are ints
+    capacity = 1 << max_length
+    kraft = sum(1 << (max_length - length) for length in limited.values())
+    if kraft > capacity:
+        order = sorted(limited, key=lambda char: (-limited[char], ord(char)))
+        while kraft > capacity:
+            for char in order:
+                if limited[char] < max_length:
+                    break
+            kraft -= 1 << (max_length - limited[char] - 1)
+            limited[char] += 1
+    return limited
+
+
+def canonical_code_table(lengths):
+    '''
+    Canonical Huffman code of every symbol, from the code lengths alone.
+    Symbols are sorted by code length then code point, and every code is
+    the previous one plus 1, shifted left when the length grows. Two
+    sides knowing the same lengths thus assign the same codes.
+    params:
+        lengths : dict mapping every symbol to its code length
+    result:
+        code_table : dict mapping every symbol to (code, length)
+    '''
+    code_table = dict()
+    code, previous_length = 0, 0
+    for char in sorted(lengths, key=lambda char: (lengths[char], ord(char))):
+        length = lengths[char]
+        code <<= length - previous_length
+        code_table[char] = (code, length)
+        code += 1
+        previous_length = length
+    return code_table
+
+
+def tree_from_code_table(code_table):
+    '''
+    Rebuilds a Huffman tree (for the table-driven decoder) from a Code
+    Table. Leaves have no frequency.
+    Raises ValueError if the codes are not a prefix code.
+    '''
+    if not code_table:
+        return Huffman_Tree(None)
+    root = Huffman_Tree.Inner_Node(None, None)
+    for char, (code, length) in code_table.items():
+        node = root
+        for position in range(length - 1, -1, -1):
+            bit = (code >> position) & 1
+            child = node.right if bit else node.left
+            if position == 0: # Last bit: the leaf goes here
+                if child is not None:
+                    raise ValueError("Code lengths are not a prefix code")
+                child = Huffman_Tree.Leaf_Node(char, None)
+            elif child is None:
+                child = Huffman_Tree.Inner_Node(None, None)
+            elif type(child) is Huffman_Tree.Leaf_Node:
+                raise ValueError("Code lengths are not a prefix code")
+            if bit:
+                node.right = child
+            else:
+                node.left = child
+            node = child
+    return Huffman_Tree(root)
+
+
+# Helper function: appends an unsigned LEB128 varint to a bytearray
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+# Helper function: (value, next offset) of the varint at offset
+def read_varint(data, offset):
+    value, shift = 0, 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated canonical Huffman header")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def write_header(lengths, bit_length):
+    '''
+    Serializes the code lengths and the payload bit length (see the data
+    layout above).
+    '''
+    header = bytearray(HEADER_MAGIC)
+    header.append(HEADER_VERSION)
+    write_varint(header, len(lengths))
+    write_varint(header, bit_length)
+    chars = sorted(lengths, key=ord)
+    previous = -1
+    for char in chars:
+        write_varint(header, ord(char) - previous - 1)
+        previous = ord(char)
+    for index in range(0, len(chars), 2):
+        high = lengths[chars[index]]
+        low = lengths[chars[index + 1]] if index + 1 < len(chars) else 0
+        header.append((high << 4) | low)
+    return header
+
+
+def read_header(data):
+    '''
+    Parses a header written by write_header().
+    result:
+        lengths : dict mapping every symbol to its code length
+        bit_length : bit length of the payload
+        offset : where the payload starts
+    Raises ValueError on anything that is not a valid header.
+    '''
+    if data[:2] != HEADER_MAGIC or data[2:3] != bytes((HEADER_VERSION,)):
+        raise ValueError("Not canonical Huffman data")
+    count, offset = read_varint(data, 3)
+    bit_length, offset = read_varint(data, offset)
+    chars = []
+    previous = -1
+    for _ in range(count):
+        delta, offset = read_varint(data, offset)
+        previous += delta + 1
+        if previous > 0x10FFFF:
+            raise ValueError("Invalid symbol in canonical Huffman header")
+        chars.append(chr(previous))
+    packed = data[offset:offset + (count + 1) // 2]
+    if len(packed) < (count + 1) // 2:
+        raise ValueError("Truncated canonical Huffman header")
+    offset += len(packed)
+    lengths = dict()
+    for index, char in enumerate(chars):
+        length = packed[index >> 1] >> 4 if index % 2 == 0 else packed[index >> 1] & 0x0F
+        if length == 0:
+            raise ValueError("Invalid code length in canonical Huffman header")
+        lengths[char] = length
+    if sum(1 << (MAX_CODE_LENGTH - length) for length in lengths.values()) > 1 << MAX_CODE_LENGTH:
+        raise ValueError("Code lengths are not a prefix code")
+    return lengths, bit_length, offset
+
+
+def canonical_encoding(data, max_length=MAX_CODE_LENGTH):
+    '''
+    Self-contained Huffman encoder: the output carries its own code
+    lengths in a compact header, so any process can decode it with
+    canonical_decoding() alone.
+    params:
+        data : original data string
+        max_length : longest code allowed, at most MAX_CODE_LENGTH
+    result:
+        encoded : bytes, header followed by the payload
+    '''
+    if not 1 <= max_length <= MAX_CODE_LENGTH:
+        raise ValueError("max_length must be between 1 and {}".format(MAX_CODE_LENGTH))
+    if data == "":
+        return bytes(write_header({}, 0))
+
+    # Counter counts in C, a dict loop in Python
+    lengths = limit_code_lengths(code_lengths(build_huffman_tree(Counter(data))),
+                                 max_length)
+    writer = Bit_Writer()
+    encode_symbols(data, build_code_strings(canonical_code_table(lengths)), writer)
+    stream = writer.finish()
+    return bytes(write_header(lengths, stream.bit_length) + stream.data)
+
+
+def canonical_decoding(encoded):
+    '''
+    Decodes the output of canonical_encoding(): rebuilds the codes from
+    the lengths in the header, then decodes the payload with the
+    table-driven decoder.
+    params:
+        encoded : bytes-like, header followed by the payload
+    result:
+        decoded_data : original data string
+    Raises ValueError if encoded is not valid canonical Huffman data.
+    '''
+    encoded = bytes(encoded)
+    lengths, bit_length, offset = read_header(encoded)
+    payload = encoded[offset:]
+    if len(payload) * 8 < bit_length:
+        raise ValueError("Truncated canonical Huffman payload")
+    tree = tree_from_code_table(canonical_code_table(lengths))
+    return table_decoding(Bit_Stream(payload, bit_length), tree)
+
+
+if __name__ == "__main__":
+
+    print("\n\n")
+    print("# Test Case 1: Round trip, header size")
+    a_great_sentence = "The bird is the word"
+    encoded = canonical_encoding(a_great_sentence)
+    lengths, bit_length, offset = read_header(encoded)
+    print(canonical_decoding(encoded))
+    print("{} bytes: {} of header for {} symbols, {} of payload".format(
+        len(encoded), offset, len(lengths), len(encoded) - offset))
+    # Expected to see the sentence back, in 32 bytes: 23 of header for the
+    # 12 distinct symbols and the 9 bytes of the 70 bit payload.
+
+    print("\n\n")
+    print("# Test Case 2: Same lengths, same codes")
+    print(canonical_code_table({"a": 1, "b": 2, "c": 3, "d": 3}))
+    # Expected to see the (code, length) pairs of a: 0, b: 10, c: 110 and
+    # d: 111.
+
+    print("\n\n")
+    print("# Test Case 3: Length-limited codes")
+    # Fibonacci frequencies give the deepest possible Huffman tree
+    frequencies = [1, 1]
+    while len(frequencies) < 25:
+        frequencies.append(frequencies[-1] + frequencies[-2])
+    skewed = "".join(chr(65 + index) * count for index, count in enumerate(frequencies))
+    unlimited = code_lengths(build_huffman_tree(
+        {chr(65 + index): count for index, count in enumerate(frequencies)}))
+    encoded = canonical_encoding(skewed)
+    print(max(unlimited.values()), max(read_header(encoded)[0].values()))
+    print(canonical_decoding(encoded) == skewed)
+    # Expected to see 24 15 (the longest code before and after limiting)
+    # and True.
+
+    print("\n\n")
+    print("# Test Case 4: Empty, one symbol, and not canonical data")
+    print(repr(canonical_decoding(canonical_encoding(""))),
+          canonical_decoding(canonical_encoding("bbbb")))
+    try:
+        canonical_decoding(b"hello")
+    except ValueError as error:
+        print(error)
+    # Expected to see '' bbbb and an error message.
@@ -0,0 +1,249 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Parallel block container
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from canonical_huffman import (MAX_CODE_LENGTH, canonical_code_table, canonical_decoding,
+                               canonical_encoding, code_lengths, limit_code_lengths,
+                               read_header, read_varint, tree_from_code_table,
+                               write_header, write_varint)
+from problem_3 import (Bit_Stream, Bit_Writer, build_code_strings, build_huffman_tree,
+                       encode_symbols, table_decoding)
+
+# Script Params
+BLOCK_SIZE = 1 << 20 # Characters per block
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Container layout:
+#   magic, version      - CONTAINER_MAGIC and CONTAINER_VERSION
+#   flags               - SHARED_TABLE when all blocks use one code table
+#   varint              - number of blocks n
+#   n x (varint, varint) - block index: compressed bytes and characters of
+#                          every block, in order
+#   [shared table]      - with SHARED_TABLE: a canonical header holding the
+#                         code lengths (and a 0 bit payload length)
+#   n blocks            - with SHARED_TABLE: varint payload bit length and
+#                         the payload; otherwise a whole canonical_encoding()
+#                         output, with its own table
+CONTAINER_MAGIC = b"HB"
+CONTAINER_VERSION = 1
+SHARED_TABLE = 0x01
+
+
+# Helper functions for the pool workers (module level, so they pickle)
+
+def count_block(block):
+    return Counter(block)
+
+
+def encode_block(block, max_length):
+    return canonical_encoding(block, max_length)
+
+
+def encode_block_shared(block, lengths):
+    writer = Bit_Writer()
+    encode_symbols(block, build_code_strings(canonical_code_table(lengths)), writer)
+    stream = writer.finish()
+    encoded = bytearray()
+    write_varint(encoded, stream.bit_length)
+    return bytes(encoded + stream.data)
+
+
+def decode_block(encoded, lengths=None):
+    if lengths is None: # Own table
+        return canonical_decoding(encoded)
+    bit_length, offset = read_varint(encoded, 0)
+    payload = encoded[offset:]
+    if len(payload) * 8 < bit_length:
+        raise ValueError("Truncated Huffman block")
+    tree = tree_from_code_table(canonical_code_table(lengths))
+    return table_decoding(Bit_Stream(payload, bit_length), tree)
+
+
+# Helper function: list(map(function, *iterables)), in a process pool
+# when there are several workers and several tasks
+def pool_map(function, workers, *iterables):
+    tasks = [list(iterable) for iterable in iterables]
+    if workers <= 1 or len(tasks[0]) <= 1:
+        return list(map(function, *tasks))
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks[0]))) as pool:
+        return list(pool.map(function, *tasks))
+
+
+def compress_blocks(data, block_size=BLOCK_SIZE, workers=DEFAULT_WORKERS,
+                    shared_table=False, max_length=MAX_CODE_LENGTH):
+    '''
+    Splits a string into blocks of block_size characters and Huffman
+    encodes them independently in a process pool, into one container
+    with a block index.
+    With shared_table, the frequencies are counted per block in the pool,
+    merged, and every block is encoded with the one resulting table: a
+    single header and slightly better codes for homogeneous data. Without
+    it every block carries its own canonical table, which adapts to data
+    whose statistics drift.
+    Either way every block decodes on its own, so decompress_blocks() can
+    decode them in parallel and read_block() can decode just one.
+    params:
+        data : original data string
+        block_size : characters per block
+        workers : number of processes, 1 works in this process
+        shared_table : one code table for all blocks
+        max_length : longest code allowed
+    result:
+        container : bytes
+    '''
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+    blocks = [data[start:start + block_size] for start in range(0, len(data), block_size)]
+    container = bytearray(CONTAINER_MAGIC)
+    container.append(CONTAINER_VERSION)
+    container.append(SHARED_TABLE if shared_table else 0)
+
+    if shared_table and blocks:
+        char_frequency = Counter()
+        for block_frequency in pool_map(count_block, workers, blocks):
+            char_frequency.update(block_frequency)
+        lengths = limit_code_lengths(code_lengths(build_huffman_tree(char_frequency)),
+                                     max_length)
+        encoded_blocks = pool_map(encode_block_shared, workers, blocks,
+                                  [lengths] * len(blocks))
+        table = write_header(lengths, 0)
+    else:
+        encoded_blocks = pool_map(encode_block, workers, blocks, [max_length] * len(blocks))
+        table = b""
+
+    write_varint(container, len(blocks))
+    for block, encoded in zip(blocks, encoded_blocks):
+        write_varint(container, len(encoded))
+        write_varint(container, len(block))
+    container += table
+    for encoded in encoded_blocks:
+        container += encoded
+    return bytes(container)
+
+
+class Block_Container:
+    '''
+    Parsed view of a compress_blocks() container: the block index, the
+    shared code lengths if any, and the encoded blocks, still encoded.
+    Interface:
+        .block_count() - Number of blocks.
+        .read_block(index) - Decodes one block only.
+        .block_of(position) - (block index, offset in the block) of a
+                              character position in the original data.
+    Raises ValueError if the data is not a valid container.
+    '''
+
+    def __init__(self, container):
+        self.container = container = bytes(container)
+        if container[:2] != CONTAINER_MAGIC or container[2:3] != bytes((CONTAINER_VERSION,)):
+            raise ValueError("Not a Huffman block container")
+        if len(container) < 4:
+            raise ValueError("Truncated Huffman block container")
+        flags = container[3]
+        count, offset = read_varint(container, 4)
+        index = []
+        for _ in range(count):
+            encoded_size, offset = read_varint(container, offset)
+            char_count, offset = read_varint(container, offset)
+            index.append((encoded_size, char_count))
+        self.lengths = None
+        if flags & SHARED_TABLE and count:
+            self.lengths, _, table_size = read_header(container[offset:])
+            offset += table_size
+        # Where every block starts, in the container and in the data
+        self.block_offsets, self.char_offsets = [], []
+        char_offset = 0
+        for encoded_size, char_count in index:
+            self.block_offsets.append(offset)
+            self.char_offsets.append(char_offset)
+            offset += encoded_size
+            char_offset += char_count
+        self.sizes = [encoded_size for encoded_size, _ in index]
+        if offset > len(container):
+            raise ValueError("Truncated Huffman block container")
+        self.char_count = char_offset
+
+    def block_count(self):
+        return len(self.sizes)
+
+    def encoded_block(self, index):
+        start = self.block_offsets[index]
+        return self.container[start:start + self.sizes[index]]
+
+    def read_block(self, index):
+        return decode_block(self.encoded_block(index), self.lengths)
+
+    def block_of(self, position):
+        if not 0 <= position < self.char_count:
+            raise IndexError("position out of range")
+        # Binary search of the last block starting at or before position
+        low, high = 0, len(self.char_offsets) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.char_offsets[middle] <= position:
+                low = middle
+            else:
+                high = middle - 1
+        return low, position - self.char_offsets[low]
+
+
+def decompress_blocks(container, workers=DEFAULT_WORKERS):
+    '''
+    Decodes a whole compress_blocks() container, the blocks in parallel
+    in a process pool.
+    params:
+        container : bytes-like
+        workers : number of processes, 1 works in this process
+    result:
+        decoded_data : original data string
+    '''
+    blocks = Block_Container(container)
+    count = blocks.block_count()
+    return "".join(pool_map(decode_block, workers,
+                            [blocks.encoded_block(index) for index in range(count)],
+                            [blocks.lengths] * count))
+
+
+def read_block(container, index):
+    '''
+    Random access: decodes only block index of a container.
+    '''
+    return Block_Container(container).read_block(index)
+
+
+if __name__ == "__main__":
+
+    sentence = "The bird is the word. "
+    data = "".join("{}{}".format(sentence, number) for number in range(2000))
+
+    print("\n\n")
+    print("# Test Case 1: Round trip with per-block and shared tables")
+    for shared_table in (False, True):
+        container = compress_blocks(data, block_size=5000, workers=2,
+                                    shared_table=shared_table)
+        print("shared_table={}: {} chars -> {} bytes in {} blocks, equal: {}".format(
+            shared_table, len(data), len(container),
+            Block_Container(container).block_count(),
+            decompress_blocks(container, workers=2) == data))
+    # Expected to see True twice, the shared table container a bit smaller.
+
+    print("\n\n")
+    print("# Test Case 2: Random access to one block")
+    blocks = Block_Container(container)
+    block_index, offset = blocks.block_of(23456)
+    print(block_index, offset, blocks.read_block(block_index)[offset:offset + 10] ==
+          data[23456:23466])
+    # Expected to see 4 3456 True: only block 4 is decoded.
+
+    print("\n\n")
+    print("# Test Case 3: Empty data and not a container")
+    print(repr(decompress_blocks(compress_blocks(""))))
+    try:
+        decompress_blocks(b"hello")
+    except ValueError as error:
+        print(error)
+    # Expected to see '' and an error message.
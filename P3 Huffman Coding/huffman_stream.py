@@ -0,0 +1,206 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Streaming file compression
+
+from collections import Counter
+
+from canonical_huffman import (MAX_CODE_LENGTH, canonical_code_table, code_lengths,
+                               limit_code_lengths, read_header, tree_from_code_table,
+                               write_header)
+from problem_3 import (Bit_Writer, build_code_strings, build_huffman_tree,
+                       encode_symbols, new_decoder)
+
+# Script Params
+STREAM_CHUNK = 1 << 20 # Characters (compression) or bytes (decompression) per read
+# Largest possible canonical header: magic and version, two varints, up
+# to 2^15 symbols of at most 3 varint bytes each, and their lengths
+MAX_HEADER_SIZE = 3 + 10 + 10 + (1 << MAX_CODE_LENGTH) * 3 + (1 << MAX_CODE_LENGTH) // 2
+
+
+def compress_stream(source, target, chunk_size=STREAM_CHUNK, max_length=MAX_CODE_LENGTH):
+    '''
+    Huffman-compresses a text stream of any size in two passes over it,
+    holding only one chunk of text at a time.
+    The first pass counts the symbol frequencies chunk by chunk (Counter
+    counts in C, so this pass costs a fraction of the encoding). The code
+    lengths then give the payload size up front, so the canonical header
+    (see canonical_huffman.py) is written first and the second pass
+    writes the payload out chunk by chunk as it is encoded.
+    The output can be read back by decompress_stream(), or in one go by
+    canonical_decoding().
+    params:
+        source : seekable text file object, read from its current position
+        target : binary file object
+        chunk_size : characters read at a time
+        max_length : longest code allowed
+    result:
+        written : bytes written to target
+    Raises ValueError if the source changes between the two passes.
+    '''
+    start = source.tell()
+    char_frequency = Counter()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        char_frequency.update(chunk)
+
+    if not char_frequency: # Empty input
+        header = write_header({}, 0)
+        target.write(header)
+        return len(header)
+
+    lengths = limit_code_lengths(code_lengths(build_huffman_tree(char_frequency)),
+                                 max_length)
+    bit_length = sum(count * lengths[char] for char, count in char_frequency.items())
+    header = write_header(lengths, bit_length)
+    target.write(header)
+    written = len(header)
+
+    code_strings = build_code_strings(canonical_code_table(lengths))
+    writer = Bit_Writer()
+    source.seek(start)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        try:
+            encode_symbols(chunk, code_strings, writer)
+        except KeyError: # A symbol the first pass did not see
+            raise ValueError("Source changed during compression")
+        payload = writer.take_bytes()
+        target.write(payload)
+        written += len(payload)
+    last = writer.finish()
+    if last.bit_length != bit_length:
+        raise ValueError("Source changed during compression")
+    target.write(last.data)
+    return written + len(last.data)
+
+
+# Helper function: reads and parses the canonical header at the start of a
+# binary stream. Returns the read_header() results and the bytes read past
+# the header (the start of the payload).
+def read_stream_header(source, chunk_size):
+    buffer = source.read(min(chunk_size, MAX_HEADER_SIZE))
+    while True:
+        try:
+            lengths, bit_length, offset = read_header(buffer)
+        except ValueError:
+            # Possibly just cut short: read on, up to the largest header
+            more = source.read(min(chunk_size, MAX_HEADER_SIZE))
+            if not more or len(buffer) >= MAX_HEADER_SIZE:
+                raise
+            buffer += more
+            continue
+        return lengths, bit_length, buffer[offset:]
+
+
+def decompress_stream(source, target, chunk_size=STREAM_CHUNK):
+    '''
+    Decodes the output of compress_stream() (or canonical_encoding())
+    reading it chunk by chunk, so memory use does not grow with the data:
+    the decoder keeps the bits not decoded yet between chunks.
+    params:
+        source : binary file object
+        target : text file object
+        chunk_size : bytes read at a time
+    result:
+        decoded : characters written to target
+    Raises ValueError if source is not valid or is truncated.
+    '''
+    lengths, bit_length, pending = read_stream_header(source, chunk_size)
+    if not lengths:
+        return 0
+    decoder = new_decoder(tree_from_code_table(canonical_code_table(lengths)), bit_length)
+    full_bytes, tail_bits = bit_length >> 3, bit_length & 7
+    decoded = 0
+    while full_bytes:
+        if not pending:
+            pending = source.read(min(chunk_size, full_bytes))
+            if not pending:
+                raise ValueError("Truncated canonical Huffman payload")
+        piece, pending = pending[:full_bytes], pending[full_bytes:]
+        full_bytes -= len(piece)
+        text = decoder.decode(piece)
+        target.write(text)
+        decoded += len(text)
+    last_byte = 0
+    if tail_bits:
+        if not pending:
+            pending = source.read(1)
+            if not pending:
+                raise ValueError("Truncated canonical Huffman payload")
+        last_byte = pending[0]
+    text = decoder.finish(last_byte, tail_bits)
+    target.write(text)
+    return decoded + len(text)
+
+
+def compress_file(source_path, target_path, encoding="utf-8", **stream_params):
+    '''
+    compress_stream() from a text file to a new binary file. Line endings
+    are kept as they are.
+    '''
+    with open(source_path, "r", encoding=encoding, newline="") as source:
+        with open(target_path, "wb") as target:
+            return compress_stream(source, target, **stream_params)
+
+
+def decompress_file(source_path, target_path, encoding="utf-8", **stream_params):
+    '''
+    decompress_stream() from a binary file to a new text file.
+    '''
+    with open(source_path, "rb") as source:
+        with open(target_path, "w", encoding=encoding, newline="") as target:
+            return decompress_stream(source, target, **stream_params)
+
+
+if __name__ == "__main__":
+
+    import filecmp
+    import os
+    import tempfile
+
+    work_dir = tempfile.mkdtemp()
+    compressed_path = os.path.join(work_dir, "compressed.huf")
+    restored_path = os.path.join(work_dir, "restored.txt")
+
+    print("\n\n")
+    print("# Test Case 1: This script, in small chunks")
+    script_path = os.path.abspath(__file__)
+    written = compress_file(script_path, compressed_path, chunk_size=1000)
+    decompress_file(compressed_path, restored_path, chunk_size=100)
+    print("{} -> {} bytes, same content: {}".format(
+        os.path.getsize(script_path), written,
+        filecmp.cmp(script_path, restored_path, shallow=False)))
+    # Expected to see the file compressed to a bit more than half its size
+    # and True.
+
+    print("\n\n")
+    print("# Test Case 2: Windows line endings and non-ASCII text")
+    text_path = os.path.join(work_dir, "text.txt")
+    with open(text_path, "w", encoding="utf-8", newline="") as text_file:
+        text_file.write("línea uno\r\nlínea dos ☃\r\n" * 100)
+    compress_file(text_path, compressed_path, chunk_size=7)
+    decompress_file(compressed_path, restored_path, chunk_size=3)
+    print(filecmp.cmp(text_path, restored_path, shallow=False))
+    # Expected to see True.
+
+    print("\n\n")
+    print("# Test Case 3: Empty file and truncated data")
+    open(text_path, "w").close()
+    compress_file(text_path, compressed_path)
+    print(decompress_file(compressed_path, restored_path))
+    compress_file(script_path, compressed_path)
+    with open(compressed_path, "r+b") as compressed_file:
+        compressed_file.truncate(os.path.getsize(compressed_path) // 2)
+    try:
+        decompress_file(compressed_path, restored_path)
+    except ValueError as error:
+        print(error)
+    # Expected to see 0 and an error message.
+
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    os.rmdir(work_dir)
@@ -0,0 +1,255 @@
+# Udacity Data Structures and Algorithms
+# Part 2 - Data Structures
+# Project 2 - Problem #3 - Huffman Coding - Reusable code tables
+
+from collections import Counter, OrderedDict
+from itertools import islice
+
+from adaptive_huffman import UTF8_LENGTHS
+from canonical_huffman import (MAX_CODE_LENGTH, canonical_code_table, code_lengths,
+                               limit_code_lengths, tree_from_code_table)
+from problem_3 import (AUTOMATON_BYTES_PER_STATE, Bit_Reader, Bit_Writer, Huffman_Tree,
+                       build_code_strings, build_huffman_tree, encode_symbols,
+                       new_decoder)
+
+# Script Params
+# Pseudo-symbol of the escape code. A symbol the table does not cover is
+# sent as the escape code followed by its UTF-8 bytes, 8 bits each. A
+# real chr(0x10FFFF) in the data is always escaped, so a decoded ESCAPE
+# always starts a literal.
+ESCAPE = chr(0x10FFFF)
+DEFAULT_CAPACITY = 64 # Tables kept by a Code_Table_Cache
+# A fingerprint keeps every symbol of at least 1/FINGERPRINT_SCALE of the
+# message, with its share rounded to a power of two
+FINGERPRINT_SCALE = 16
+
+
+class Huffman_Code_Table:
+    '''
+    Huffman code table built once and reused for any number of messages:
+    canonical codes (see canonical_huffman.py) of some symbol counts,
+    plus an escape code for the symbols they do not cover. Encoding a
+    message is then only the code lookups, with no tree to build.
+    Interface:
+        .encode(data) - Bit_Stream of a data string.
+        .decode(encoded_data) - Data string of a Bit_Stream.
+        .covers(char) - True if char has its own code.
+    '''
+
+    def __init__(self, char_frequency, max_length=MAX_CODE_LENGTH):
+        counts = {char: count for char, count in char_frequency.items() if char != ESCAPE}
+        counts[ESCAPE] = 1 # As rare as can be
+        lengths = limit_code_lengths(code_lengths(build_huffman_tree(counts)), max_length)
+        code_table = canonical_code_table(lengths)
+        self.code_strings = build_code_strings(code_table)
+        self.escape_code = self.code_strings.pop(ESCAPE)
+        self.tree = tree_from_code_table(code_table)
+        # Built on the first decode() for one message's size, and built
+        # again once the messages decoded so far would have paid for the
+        # faster automaton (see new_decoder())
+        self.decoder = None
+        self.decoded_bytes = 0
+        self.rebuild_at = len(code_table) * AUTOMATON_BYTES_PER_STATE
+
+    def covers(self, char):
+        return char in self.code_strings
+
+    def encode(self, data):
+        code_strings = self.code_strings
+        missing = set(data).difference(code_strings)
+        if missing:
+            # Codes of this message only: escape code and literal bytes
+            code_strings = dict(code_strings)
+            for char in missing:
+                code_strings[char] = self.escape_code + "".join(
+                    format(byte, "08b") for byte in char.encode("utf-8", "surrogatepass"))
+        writer = Bit_Writer()
+        encode_symbols(data, code_strings, writer)
+        return writer.finish()
+
+    def decode(self, encoded_data):
+        # Table-driven first: right unless the message has escapes
+        self.decoded_bytes += len(encoded_data.data)
+        if self.decoder is None or self.decoded_bytes >= self.rebuild_at:
+            self.decoder = new_decoder(self.tree, self.decoded_bytes * 8)
+            if self.decoded_bytes >= self.rebuild_at:
+                self.rebuild_at = float("inf")
+        decoder = self.decoder
+        full_bytes = encoded_data.bit_length >> 3
+        tail_bits = encoded_data.bit_length & 7
+        try:
+            decoded_data = decoder.decode(encoded_data.data[:full_bytes])
+            decoded_data += decoder.finish(
+                encoded_data.data[full_bytes] if tail_bits else 0, tail_bits)
+        except ValueError: # Possibly a literal read as codes
+            decoded_data = ESCAPE
+        if ESCAPE not in decoded_data:
+            return decoded_data
+        return escape_decoding(encoded_data, self.tree)
+
+
+# Helper function: the next byte of a bit iterator
+def read_literal_byte(bits):
+    byte_bits = tuple(islice(bits, 8))
+    if len(byte_bits) < 8:
+        raise ValueError("Truncated Huffman data")
+    byte = 0
+    for bit in byte_bits:
+        byte = (byte << 1) | bit
+    return byte
+
+
+def escape_decoding(encoded_data, tree):
+    '''
+    Bit by bit tree walk decoder of a Huffman_Code_Table message, reading
+    the literal after every escape code.
+    params:
+        encoded_data : Bit_Stream
+        tree : Huffman_Tree class object, with an ESCAPE leaf
+    result:
+        decoded_data : original data string
+    Raises ValueError if encoded_data is not valid.
+    '''
+    bits = Bit_Reader(encoded_data).bits()
+    decoded_chars = []
+    node = tree.root
+    for bit in bits:
+        node = node.right if bit else node.left
+        if node is None:
+            raise ValueError("Invalid Huffman code in the encoded data")
+        if type(node) is not Huffman_Tree.Leaf_Node:
+            continue
+        if node.char == ESCAPE:
+            literal = bytearray((read_literal_byte(bits),))
+            if not UTF8_LENGTHS[literal[0]]:
+                raise ValueError("Invalid escaped symbol in the encoded data")
+            while len(literal) < UTF8_LENGTHS[literal[0]]:
+                literal.append(read_literal_byte(bits))
+            try:
+                decoded_chars.append(literal.decode("utf-8", "surrogatepass"))
+            except UnicodeDecodeError:
+                raise ValueError("Invalid escaped symbol in the encoded data")
+        else:
+            decoded_chars.append(node.char)
+        node = tree.root
+    if node is not tree.root:
+        raise ValueError("Truncated Huffman data")
+    return "".join(decoded_chars)
+
+
+def train_code_table(corpus, max_length=MAX_CODE_LENGTH):
+    '''
+    Trains a code table on a sample corpus, to encode every later message
+    of the same kind without building a tree.
+    params:
+        corpus : iterable of sample data strings
+        max_length : longest code allowed
+    result:
+        table : Huffman_Code_Table
+    '''
+    char_frequency = Counter()
+    for sample in corpus:
+        char_frequency.update(sample)
+    return Huffman_Code_Table(char_frequency, max_length)
+
+
+def fingerprint(char_frequency, total):
+    '''
+    Quantized frequency profile of a message: its symbols of at least
+    1/FINGERPRINT_SCALE of the total, each with the bit length of its
+    share in 1/FINGERPRINT_SCALE units. Messages of about the same
+    profile get the same fingerprint.
+    '''
+    return tuple(sorted((char, (count * FINGERPRINT_SCALE // total).bit_length())
+                        for char, count in char_frequency.items()
+                        if count * FINGERPRINT_SCALE >= total))
+
+
+class Code_Table_Cache:
+    '''
+    LRU cache of code tables keyed by fingerprint(): a message whose
+    profile was seen lately is encoded with the table built then; only
+    on a miss is a table built, from the message itself. Symbols of the
+    message the table lacks are escaped.
+    Interface:
+        .encode(data) - (Bit_Stream, Huffman_Code_Table), like
+                        huffman_encoding() returns the tree to decode with.
+        .hits / .misses - Lookups so far.
+    '''
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_length=MAX_CODE_LENGTH):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.max_length = max_length
+        self.tables = OrderedDict() # fingerprint -> table, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def table_for(self, data):
+        char_frequency = Counter(data)
+        key = fingerprint(char_frequency, len(data) or 1)
+        table = self.tables.get(key)
+        if table is not None:
+            self.hits += 1
+            self.tables.move_to_end(key)
+            return table
+        self.misses += 1
+        table = Huffman_Code_Table(char_frequency, self.max_length)
+        self.tables[key] = table
+        if len(self.tables) > self.capacity:
+            self.tables.popitem(last=False)
+        return table
+
+    def encode(self, data):
+        table = self.table_for(data)
+        return table.encode(data), table
+
+
+if __name__ == "__main__":
+
+    import random
+
+    generator = random.Random(3)
+
+    def telemetry_message():
+        return "sensor={};temp={:.1f};status={}\n".format(
+            generator.randrange(100), generator.uniform(10, 40),
+            generator.choice(("ok", "ok", "ok", "warn")))
+
+    print("\n\n")
+    print("# Test Case 1: A table trained once, reused for new messages")
+    table = train_code_table(telemetry_message() for _ in range(200))
+    message = telemetry_message()
+    encoded_data = table.encode(message)
+    print(repr(table.decode(encoded_data)), encoded_data.bit_length, len(message) * 8)
+    # Expected to see the message back, in about half of its 8-bit size.
+
+    print("\n\n")
+    print("# Test Case 2: Symbols the table does not cover are escaped")
+    message = "sensor=7;temp=21.5;status=FAIL ☃\n"
+    encoded_data = table.encode(message)
+    print(table.covers("F"), repr(table.decode(encoded_data)))
+    # Expected to see False and the message back.
+
+    print("\n\n")
+    print("# Test Case 3: LRU cache keyed by frequency profile")
+    cache = Code_Table_Cache()
+    messages = [telemetry_message() for _ in range(1000)]
+    print(all(table.decode(encoded_data) == message
+              for message, (encoded_data, table) in zip(messages, map(cache.encode, messages))))
+    print(cache.hits > cache.misses, len(cache.tables))
+    # Expected to see True, then True 64: most messages reuse one of the
+    # 64 tables kept.
+
+    print("\n\n")
+    print("# Test Case 4: Empty message and truncated data")
+    encoded_data, table = cache.encode("")
+    print(repr(table.decode(encoded_data)))
+    encoded_data = table.encode("x" * 20)
+    encoded_data.bit_length -= 3
+    try:
+        table.decode(encoded_data)
+    except ValueError as error:
+        print(error)
+    # Expected to see '' and an error message.
@@ -3,95 +3,151 @@
 # Project 2 - Problem #3 - Huffman Coding
 
 import sys
+from collections import Counter
 from dataclasses import dataclass
+from itertools import chain, islice
+
+try:
+    import numpy
+except ImportError: # Optional, only speeds up byte_frequencies()
+    numpy = None
+
+# Script Params
+# Bits gathered in the Bit_Writer accumulator before whole bytes are
+# moved out: big enough to amortize the flush, small enough to keep the
+# int shifts cheap
+FLUSH_BITS = 256
+# Symbols encoded per chunk (see huffman_encoding)
+ENCODE_CHUNK = 1 << 16
+# Bytes inputs from this size on, with at most this many distinct byte
+# values, are encoded two bytes per lookup. With more values the pairs
+# in use no longer fit in the CPU caches and the lookups get slower.
+PAIR_TABLE_MIN_SIZE = 1 << 16
+PAIR_TABLE_MAX_SYMBOLS = 96
+# Bits looked up at once by the Root_Table_Decoder: a 2^10 entry root
+# table, built in well under a millisecond, holds the codes of all but
+# the rarest symbols
+DECODE_TABLE_BITS = 10
+# The Table_Decoder automaton (256 entries per inner node of the tree)
+# is only built for payloads of at least this many bytes per inner node,
+# where its faster decoding pays for the build, and up to this many
+# inner nodes
+AUTOMATON_BYTES_PER_STATE = 768
+AUTOMATON_MAX_STATES = 4096
+# Payloads up to this many bits are decoded by the plain tree walk,
+# cheaper than building any table for them
+TREE_WALK_MAX_BITS = 512
+# The 8 bits of every byte value, most significant first
+BYTE_BITS = [tuple((byte >> shift) & 1 for shift in range(7, -1, -1))
+             for byte in range(256)]
 
 # Binary Minimum Heap structure helper class farther used 
 # for creating a minimum frequency priority queue.
 class Min_Heap:
-    
-    # Helper data class for heap node
-    @dataclass
-    class Node:
-        data : object
-        frequency : int
+    '''
+    Array-backed binary min-heap priority queue.
+    Every entry is a (frequency, order, data) tuple in a plain list: no
+    node object per push, and tuples compare in C. order is a running
+    counter, so entries of equal frequency come out first in, first out
+    (a stable tie-breaker) and data itself is never compared.
+    The sifts are loops, not recursion.
+    Interface:
+        .push(data, frequency)
+        .pop() - (data, frequency) of the least frequency, None if empty.
+        .peek() - Same as pop() without removing it.
+        .pushpop(data, frequency) - push() then pop(), in one sift.
+        .heapify(items) - Replaces the contents with (data, frequency)
+                          pairs in O(n), instead of n pushes.
+        .size() / .is_empty()
+    '''
 
-    def __init__(self):
+    def __init__(self, items=()):
         # List based heap
         self.heap = []
-        self.head = None
-        self.tail = None
+        self.order = 0 # Next tie-breaker
+        if items:
+            self.heapify(items)
  
     def size(self):
         return len(self.heap)
 
     def is_empty(self):
-        return True if self.size() == 0 else False
+        return not self.heap
 
     def push(self, data, frequency):
-        if self.is_empty(): 
-            self.head, self.tail = 0, 0
-        else:
-            self.tail += 1 
         # A new element is initially inserted at the tail end...
-        self.heap.append(self.Node(data, frequency))
+        self.heap.append((frequency, self.order, data))
+        self.order += 1
         # ...so it needs to be repositioned to meet heap constraints.
-        self.sift_up(self.tail)
+        self.sift_up(len(self.heap) - 1)
 
     def pop(self):
-        if self.is_empty() : return None
-        if self.size() == 1 : 
-            self.head = None
-            self.tail = None
-            return self.heap.pop() 
-        self.tail -= 1 
-        node = self.heap[0]
-        # As an element is always popped from the head end, the last 
-        # heap element at tail is swapped to the head...
-        self.heap[0] = self.heap.pop()
+        if not self.heap: return None
+        last = self.heap.pop()
+        if not self.heap:
+            return last[2], last[0]
+        head = self.heap[0]
+        # As an element is always popped from the head end, the last
+        # heap element at tail is moved to the head...
+        self.heap[0] = last
         # ...so it needs to be repositioned to meet heap constraints.
-        self.sift_down(self.head)
-        return node
+        self.sift_down(0)
+        return head[2], head[0]
+
+    def peek(self):
+        if not self.heap: return None
+        return self.heap[0][2], self.heap[0][0]
+
+    def pushpop(self, data, frequency):
+        entry = (frequency, self.order, data)
+        self.order += 1
+        # The new entry would come straight back out
+        if not self.heap or entry < self.heap[0]:
+            return data, frequency
+        head = self.heap[0]
+        self.heap[0] = entry
+        self.sift_down(0)
+        return head[2], head[0]
+
+    def heapify(self, items):
+        self.heap = []
+        for data, frequency in items:
+            self.heap.append((frequency, self.order, data))
+            self.order += 1
+        # Sifts down every parent, last first: O(n) in total
+        for i in range(len(self.heap) // 2 - 1, -1, -1):
+            self.sift_down(i)
 
     def sift_up(self, i):
-        parent = self.parent(i)
-        if parent is not None:
-            if self.heap[i].frequency < self.heap[parent].frequency:
-                self.swap_nodes(i, parent)
-                self.sift_up(parent)
+        heap = self.heap
+        entry = heap[i]
+        # Moves parents down until the entry's place is found
+        while i > 0:
+            parent = (i - 1) >> 1
+            if entry < heap[parent]:
+                heap[i] = heap[parent]
+                i = parent
+            else:
+                break
+        heap[i] = entry
 
     def sift_down(self, i):
-        left, right = self.left(i), self.right(i)
-        if left and not right:
-            if self.heap[i].frequency > self.heap[left].frequency:
-                self.swap_nodes(i, left)
-                self.sift_down(left)
-        elif left and right:
-            if self.heap[left].frequency <= self.heap[right].frequency:
-                if self.heap[i].frequency > self.heap[left].frequency:
-                    self.swap_nodes(i, left)
-                    self.sift_down(left)
-            elif self.heap[right].frequency < self.heap[left].frequency:
-                if self.heap[i].frequency > self.heap[right].frequency:
-                    self.swap_nodes(i, right)
-                    self.sift_down(right)
-
-    def parent(self, i):
-        if i == 0 : return None
-        pos = (i - 1) // 2
-        return pos
-    
-    def left(self, i):
-        pos = i * 2 + 1
-        return pos if pos < self.size() else None
-    
-    def right(self, i):
-        pos = i * 2 + 2
-        return pos if pos < self.size() else None
-
-    def swap_nodes(self, a, b):
-        auxiliary_node = self.heap[a]
-        self.heap[a] = self.heap[b]
-        self.heap[b] = auxiliary_node
+        heap = self.heap
+        size = len(heap)
+        entry = heap[i]
+        # Moves the smaller child up until the entry's place is found
+        child = 2 * i + 1
+        while child < size:
+            right = child + 1
+            if right < size and heap[right] < heap[child]:
+                child = right
+            if heap[child] < entry:
+                heap[i] = heap[child]
+                i = child
+                child = 2 * i + 1
+            else:
+                break
+        heap[i] = entry
 
 
 # Helper class for creating and managing a Huffman tree
@@ -106,6 +162,303 @@ class Huffman_Tree:
         char : object
         frequency : object
     root : object
+    # Set for bytes inputs: the symbols are the latin-1 chars of the byte
+    # values, and huffman_decoding() returns bytes
+    byte_symbols : bool = False
+
+
+# Bit-packed encoded data
+@dataclass
+class Bit_Stream:
+    data : bytes
+    bit_length : int
+
+    def padding(self):
+        # Zero bits appended to fill the last byte
+        return len(self.data) * 8 - self.bit_length
+
+    def to_bits(self):
+        # '0'/'1' string form, for display
+        if self.bit_length == 0: return ""
+        bits = format(int.from_bytes(self.data, "big"), "0{}b".format(len(self.data) * 8))
+        return bits[:self.bit_length]
+
+
+class Bit_Writer:
+    '''
+    Packs variable length codes into bytes, most significant bit first.
+    Codes are shifted into an int accumulator and moved out to a
+    bytearray a whole number of bytes at a time, so building the output
+    is linear in its size.
+    '''
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.accumulator = 0
+        self.pending_bits = 0 # Bits in the accumulator
+        self.bit_length = 0 # Bits written so far
+
+    def write(self, code, length):
+        self.write_many(((code, length),))
+
+    def write_many(self, codes):
+        # Same as write() over an iterable of (code, length) pairs, with
+        # the state kept in locals for the inner loop
+        accumulator, pending_bits = self.accumulator, self.pending_bits
+        buffer = self.buffer
+        written = 0
+        for code, length in codes:
+            accumulator = (accumulator << length) | code
+            pending_bits += length
+            written += length
+            if pending_bits >= FLUSH_BITS:
+                keep = pending_bits & 7
+                buffer += (accumulator >> keep).to_bytes(pending_bits >> 3, "big")
+                accumulator &= (1 << keep) - 1
+                pending_bits = keep
+        self.accumulator, self.pending_bits = accumulator, pending_bits
+        self.bit_length += written
+
+    def take_bytes(self):
+        # Moves out the whole bytes written so far, for streaming output.
+        # finish() then only returns the bytes written after this call.
+        if self.pending_bits >= 8:
+            keep = self.pending_bits & 7
+            self.buffer += (self.accumulator >> keep).to_bytes(self.pending_bits >> 3, "big")
+            self.accumulator &= (1 << keep) - 1
+            self.pending_bits = keep
+        taken = bytes(self.buffer)
+        self.buffer.clear()
+        return taken
+
+    def finish(self):
+        # Pads the last byte with zeros and returns the Bit_Stream
+        padding = -self.pending_bits % 8
+        if self.pending_bits:
+            self.buffer += (self.accumulator << padding).to_bytes(
+                (self.pending_bits + padding) >> 3, "big")
+        self.accumulator, self.pending_bits = 0, 0
+        return Bit_Stream(bytes(self.buffer), self.bit_length)
+
+
+class Bit_Reader:
+    '''
+    Reads a Bit_Stream back, most significant bit first, never past its
+    bit_length (the padding bits are not data).
+    '''
+
+    def __init__(self, stream):
+        self.data = stream.data
+        self.bit_length = stream.bit_length
+        self.position = 0 # Bits read so far
+
+    def remaining(self):
+        return self.bit_length - self.position
+
+    def read(self, length):
+        # Next length bits as an int. Raises EOFError past the end.
+        if length > self.remaining():
+            raise EOFError("Bit_Stream exhausted")
+        start, end = self.position, self.position + length
+        first, last = start >> 3, (end + 7) >> 3
+        chunk = int.from_bytes(self.data[first:last], "big")
+        self.position = end
+        return (chunk >> (last * 8 - end)) & ((1 << length) - 1)
+
+    def bits(self):
+        # Iterator over all the remaining bits, as 0/1 ints. The bytes are
+        # expanded through BYTE_BITS, so the iteration runs in C.
+        first = self.position >> 3
+        bits = chain.from_iterable(map(BYTE_BITS.__getitem__, self.data[first:]))
+        start = self.position - first * 8
+        stop = self.bit_length - first * 8
+        self.position = self.bit_length
+        return islice(bits, start, stop)
+
+
+# Helper function: Huffman tree -> {char: (code, length)}, code as an int
+def build_code_table(tree):
+    code_table = dict()
+    pending = [(tree.root, 0, 0)] if tree.root is not None else []
+    while pending:
+        node, code, length = pending.pop()
+        if type(node) is Huffman_Tree.Leaf_Node:
+            code_table[node.char] = (code, length)
+        elif type(node) is Huffman_Tree.Inner_Node:
+            pending.append((node.left, code << 1, length + 1))
+            pending.append((node.right, (code << 1) | 1, length + 1))
+    return code_table
+
+
+def build_huffman_tree(char_frequency):
+    '''
+    Builds the Huffman tree of a Char:Frequency Map.
+    params:
+        char_frequency : dict mapping every symbol to its count (not empty)
+    result:
+        tree : Huffman_Tree class object
+    '''
+
+    # Create and fill a min-heap based Priority List, in one heapify.
+    # The queue holds the tree nodes themselves, so a popped node is
+    # linked into its parent as is.
+    priority_queue = Min_Heap((Huffman_Tree.Leaf_Node(char, freq), freq)
+                              for char, freq in char_frequency.items())
+
+    # Construct a Huffman Tree
+    tree = Huffman_Tree(None)
+
+    if priority_queue.size() == 1:
+        # Exceptional Case - Data containing only one symbol
+        tree.root = Huffman_Tree.Inner_Node(priority_queue.pop()[0], None)
+        return tree
+
+    # Combines the two least frequent nodes until one is left. The second
+    # pop and the push of the combined node are a single pushpop().
+    node1, freq1 = priority_queue.pop()
+    while not priority_queue.is_empty():
+        node2, freq2 = priority_queue.pop()
+        node1, freq1 = priority_queue.pushpop(Huffman_Tree.Inner_Node(node1, node2),
+                                              freq1 + freq2)
+    tree.root = node1
+    return tree
+
+
+def build_huffman_tree_sorted(sorted_frequencies):
+    '''
+    Builds the Huffman tree of (char, frequency) pairs already sorted by
+    increasing frequency in O(n), with two queues instead of a heap.
+    Leaves wait in the first queue in their given order; combined nodes
+    are created with non-decreasing frequencies, so appending them to the
+    second queue keeps it sorted too. The least frequent node is then
+    always at the front of one of the two queues.
+    params:
+        sorted_frequencies : list of (char, frequency), frequencies
+                             non-decreasing (not empty)
+    result:
+        tree : Huffman_Tree class object
+    '''
+
+    leaves = [(freq, Huffman_Tree.Leaf_Node(char, freq)) for char, freq in sorted_frequencies]
+    if len(leaves) == 1:
+        # Exceptional Case - Data containing only one symbol
+        return Huffman_Tree(Huffman_Tree.Inner_Node(leaves[0][1], None))
+
+    combined = [] # Second queue, array-backed: front at combined[front]
+    next_leaf, front = 0, 0
+
+    # Helper function: pops the least frequent front node (a leaf on ties)
+    def pop_least():
+        nonlocal next_leaf, front
+        if next_leaf < len(leaves) and (front == len(combined)
+                                        or leaves[next_leaf][0] <= combined[front][0]):
+            next_leaf += 1
+            return leaves[next_leaf - 1]
+        front += 1
+        return combined[front - 1]
+
+    for _ in range(len(leaves) - 1):
+        freq1, node1 = pop_least()
+        freq2, node2 = pop_least()
+        combined.append((freq1 + freq2, Huffman_Tree.Inner_Node(node1, node2)))
+    return Huffman_Tree(combined[-1][1])
+
+
+# Helper function: Code Table -> {char: '0'/'1' code string}
+def build_code_strings(code_table):
+    return {char: format(code, "0{}b".format(length))
+            for char, (code, length) in code_table.items()}
+
+
+def encode_symbols(data, code_strings, writer):
+    '''
+    Writes the codes of the symbols of data to a Bit_Writer, in a single
+    pass. Every chunk of symbols is joined as a '0'/'1' string, converted
+    to an int and written at once: the string work happens in C and only
+    one chunk's string exists at a time.
+    params:
+        data : string (or any sequence of symbols)
+        code_strings : build_code_strings() of the Code Table
+        writer : Bit_Writer
+    '''
+    for start in range(0, len(data), ENCODE_CHUNK):
+        bits = "".join(map(code_strings.__getitem__, data[start:start + ENCODE_CHUNK]))
+        if bits:
+            writer.write(int(bits, 2), len(bits))
+
+
+def byte_frequencies(data):
+    '''
+    Counts of the 256 byte values in data, as a list: with NumPy's
+    bincount when available, otherwise with Counter, which counts in C.
+    '''
+    if numpy is not None:
+        return numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8),
+                              minlength=256).tolist()
+    counts = [0] * 256
+    for byte, count in Counter(data).items():
+        counts[byte] = count
+    return counts
+
+
+def encode_bytes(data, byte_codes, writer):
+    '''
+    encode_symbols() for bytes-like data, through a list of the code
+    strings of the 256 byte values instead of a dict. From
+    PAIR_TABLE_MIN_SIZE bytes on, the data is read as 16-bit words
+    through a 65536 entry table of the codes of every byte pair, which
+    halves the lookups (unless there are more than PAIR_TABLE_MAX_SYMBOLS
+    distinct byte values).
+    params:
+        data : bytes or bytearray
+        byte_codes : list of the '0'/'1' code string of every byte value
+        writer : Bit_Writer
+    '''
+    view = memoryview(data)
+    symbols = sum(1 for code in byte_codes if code)
+    if len(data) < PAIR_TABLE_MIN_SIZE or symbols > PAIR_TABLE_MAX_SYMBOLS:
+        for start in range(0, len(data), ENCODE_CHUNK):
+            bits = "".join(map(byte_codes.__getitem__, view[start:start + ENCODE_CHUNK]))
+            if bits:
+                writer.write(int(bits, 2), len(bits))
+        return
+
+    # Word value -> codes of its two bytes, in memory (native) order
+    if sys.byteorder == "little":
+        pair_codes = [byte_codes[word & 0xFF] + byte_codes[word >> 8] for word in range(1 << 16)]
+    else:
+        pair_codes = [byte_codes[word >> 8] + byte_codes[word & 0xFF] for word in range(1 << 16)]
+    even_length = len(data) & ~1
+    for start in range(0, even_length, ENCODE_CHUNK * 2):
+        words = view[start:min(start + ENCODE_CHUNK * 2, even_length)].cast("H")
+        bits = "".join(map(pair_codes.__getitem__, words))
+        writer.write(int(bits, 2), len(bits))
+    if len(data) & 1: # Odd last byte
+        bits = byte_codes[data[-1]]
+        writer.write(int(bits, 2), len(bits))
+
+
+def bytes_encoding(data):
+    '''
+    huffman_encoding() fast path for bytes and bytearray data: counts
+    the byte values with byte_frequencies() and encodes with
+    encode_bytes(). The tree symbols are the latin-1 chars of the byte
+    values and the tree is marked byte_symbols, so huffman_decoding()
+    gives bytes back.
+    '''
+    tree = Huffman_Tree(None, byte_symbols=True)
+    if not data: return Bit_Stream(b"", 0), tree
+
+    counts = byte_frequencies(data)
+    tree.root = build_huffman_tree({chr(byte): count for byte, count in enumerate(counts)
+                                    if count}).root
+    byte_codes = [""] * 256
+    for char, (code, length) in build_code_table(tree).items():
+        byte_codes[ord(char)] = format(code, "0{}b".format(length))
+
+    writer = Bit_Writer()
+    encode_bytes(data, byte_codes, writer)
+    return writer.finish(), tree
 
 
 def huffman_encoding(data):
@@ -113,114 +466,344 @@ def huffman_encoding(data):
     Huffman encoder that encodes a data string into a bit
     sequence a generates a corresponding Huffman tree.
     params:     
-        data : original data string
+        data : original data string, or bytes / bytearray (see
+               bytes_encoding())
     result:
-        encoded_data : bit-like encoded data string
+        encoded_data : Bit_Stream, the codes packed into bytes
         tree : Huffman_Tree class object
     '''
 
+    if isinstance(data, (bytes, bytearray)): return bytes_encoding(data)
+
     # Exceptional Case - No data to compress
-    if data == "" : return "", Huffman_Tree(None)      
+    if data == "" : return Bit_Stream(b"", 0), Huffman_Tree(None)      
 
     # Create and fill a Char:Frequency Map
     char_frequency = dict()
     for char in data:
         char_frequency[char] = char_frequency.get(char, 0) + 1
 
-    # Create and fill a min-heap based Priority List
-    priority_queue = Min_Heap()
-    for char, freq in char_frequency.items():
-        priority_queue.push(char, freq)
-
     # Construct a Huffman Tree
-    tree = Huffman_Tree(None)
-
-    if priority_queue.size() == 1:
-        # Exceptional Case - Data containing only one symbol
-        node = priority_queue.pop()
-        huffman_node = Huffman_Tree.Leaf_Node(node.data, node.frequency)
-        tree.root = Huffman_Tree.Inner_Node(huffman_node, None)
-    
-    else:
-
-        # Traverse the Priority List to construct a Huffman Tree
-        while True:
-
-            # Pops the first item from priority queue.
-            node1 = priority_queue.pop()
-
-            # At some point the queue will be filled with eather original Min_Heap
-            # and Huffman_Tree node references. In here the differences as addressed.
-            if type(node1.data) is not Huffman_Tree.Inner_Node:
-                huffman_node1 = Huffman_Tree.Leaf_Node(node1.data, node1.frequency)
-            else:
-                huffman_node1 = Huffman_Tree.Inner_Node(node1.data.left, node1.data.right)
-
-            if priority_queue.is_empty(): 
-                # If the lest item was popped from the queue,
-                # it is assigned to the Huffman tree as root.
-                tree.root = huffman_node1
-                break
-            
-            # Pops second item.
-            node2 = priority_queue.pop()
+    tree = build_huffman_tree(char_frequency)
 
-            if type(node2.data) is not Huffman_Tree.Inner_Node:
-                huffman_node2 = Huffman_Tree.Leaf_Node(node2.data, node2.frequency)
-            else:
-                huffman_node2 = Huffman_Tree.Inner_Node(node2.data.left, node2.data.right)
-            
-            # Creates a combined node and pushes it back to the queue
-            combined_node = Huffman_Tree.Inner_Node(huffman_node1, huffman_node2)
-            combined_freq = node1.frequency + node2.frequency 
-            priority_queue.push(combined_node, combined_freq)
-
-    # Visit Huffman Tree nodes recursively and build up a Huffman Code Table 
-    huffman_code_table = dict()
-    def visit_node(node, acc_code=''):
-        if type(node) is Huffman_Tree.Leaf_Node:
-            huffman_code_table[node.char] = acc_code
-        if type(node) is Huffman_Tree.Inner_Node:
-            visit_node(node.left, acc_code + '0')
-            visit_node(node.right, acc_code + '1')
-    visit_node(tree.root)
+    # Visit Huffman Tree nodes and build up a Huffman Code Table
+    huffman_code_table = build_code_table(tree)
 
     # Encode Data
-    encoded_data = ""
-    for char in data:
-        encoded_data += huffman_code_table[char]
+    writer = Bit_Writer()
+    encode_symbols(data, build_code_strings(huffman_code_table), writer)
 
-    return encoded_data, tree
+    return writer.finish(), tree
 
 
-def huffman_decoding(encoded_data, tree):
+def tree_decoding(bits, tree):
     '''
-    Huffman decoder that extracts from encoded data the
-    original string sequence based on a given Huffman Tree.
-    params:     
-        encoded_data : bit-like encoded data string
+    Bit by bit Huffman tree walk decoder.
+    params:
+        bits : iterable of 0/1 ints
         tree : Huffman_Tree class object
     result:
         decoded_data : original data string
     '''
 
     # Parse encoded data and decode it based on the Huffman Tree walk
-    decoded_data = ''
-    node = tree.root
-    for bit in encoded_data:
+    decoded_chars = []
+    root = node = tree.root
+    leaf_type = Huffman_Tree.Leaf_Node # Local name, looked up every bit
+    for bit in bits:
         # Walks left or right based on current bit code
-        if bit == '0':
+        if bit == 0:
             node = node.left
         else:
             node = node.right
         # If a leaf is reached it is possible to match the code so far
         # parsed with its corresponding character
-        if type(node) is Huffman_Tree.Leaf_Node:
+        if type(node) is leaf_type:
             # Updates decoded data
-            decoded_data += node.char
+            decoded_chars.append(node.char)
             # Gets back to Huffman tree root
-            node = tree.root
+            node = root
+
+    return "".join(decoded_chars)
+
+
+# Helper function: tree walk decoding of the bit_count low bits of an
+# int, most significant first. Raises ValueError on bits that are no
+# valid code and on a last code cut short.
+def walk_bits(tree, bits, bit_count):
+    decoded_chars = []
+    root = node = tree.root
+    leaf_type = Huffman_Tree.Leaf_Node
+    for position in range(bit_count - 1, -1, -1):
+        node = node.right if (bits >> position) & 1 else node.left
+        if node is None:
+            raise ValueError("Invalid Huffman code in the encoded data")
+        if type(node) is leaf_type:
+            decoded_chars.append(node.char)
+            node = root
+    if node is not root:
+        raise ValueError("Truncated Huffman data")
+    return "".join(decoded_chars)
+
+
+def build_decode_table(tree):
+    '''
+    Byte-wise decoding automaton of a Huffman tree. Its states are the
+    inner nodes of the tree (state 0 is the root): where a code read so
+    far ends up. For every state and every byte value the table holds
+    what reading those 8 bits from that node gives:
+        (chars, next_offset)
+        chars : the symbols whose codes end within the byte, joined
+        next_offset : 256 * the state the byte leaves the walk in
+    An entry is None when the bits are no valid code (one symbol trees).
+    The table is flat, state-major, so an entry is table[offset + byte].
+    result:
+        table : list of entries
+        states : list of the inner nodes, by state number
+    '''
+    root = tree.root
+    leaf_type = Huffman_Tree.Leaf_Node
+    states, state_of = [root], {id(root): 0}
+    table = []
+    for start in states: # Grows while new states are found
+        for byte in range(256):
+            node, chars = start, []
+            for shift in range(7, -1, -1):
+                node = node.right if (byte >> shift) & 1 else node.left
+                if node is None:
+                    break
+                if type(node) is leaf_type:
+                    chars.append(node.char)
+                    node = root
+            if node is None:
+                table.append(None)
+                continue
+            state = state_of.get(id(node))
+            if state is None:
+                state = state_of[id(node)] = len(states)
+                states.append(node)
+            table.append(("".join(chars), state * 256))
+    return table, states
+
+
+class Table_Decoder:
+    '''
+    Table-driven decoder: reads the stream a byte at a time through the
+    build_decode_table() automaton, which gives every symbol ending in
+    that byte at once. A code longer than 8 bits simply spans several
+    lookups, the automaton state carrying the node reached so far, so no
+    code is too long for the table. Only the bits of the last, partial
+    byte go through the bit by bit tree walk.
+    The state is kept between calls, so a stream can be decoded in
+    pieces of any size.
+    The table has 256 entries per inner node of the tree, so it only
+    pays for itself on payloads much bigger than the alphabet (see
+    new_decoder()).
+    Interface:
+        .decode(data) - Decodes whole bytes, returns the symbols ended in them.
+        .finish(last_byte, bits) - Decodes the first bits of a last
+                                   partial byte (none by default) and
+                                   ends the stream.
+    Both raise ValueError on bits that are no valid code, finish() also
+    on a last code cut short.
+    '''
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.table, self.states = build_decode_table(tree)
+        self.offset = 0 # 256 * the automaton state
+
+    def decode(self, data):
+        table = self.table
+        decoded_chunks = []
+        append = decoded_chunks.append
+        offset = self.offset
+        try:
+            for byte in data:
+                chars, offset = table[offset + byte]
+                append(chars)
+        except TypeError: # A None entry
+            raise ValueError("Invalid Huffman code in the encoded data")
+        self.offset = offset
+        return "".join(decoded_chunks)
+
+    def finish(self, last_byte=0, bits=0):
+        decoded_chars = []
+        node = self.states[self.offset >> 8]
+        self.offset = 0
+        for shift in range(7, 7 - bits, -1):
+            node = node.right if (last_byte >> shift) & 1 else node.left
+            if node is None:
+                raise ValueError("Invalid Huffman code in the encoded data")
+            if type(node) is Huffman_Tree.Leaf_Node:
+                decoded_chars.append(node.char)
+                node = self.tree.root
+        if node is not self.tree.root:
+            raise ValueError("Truncated Huffman data")
+        return "".join(decoded_chars)
+
+
+def build_root_table(tree, table_bits=DECODE_TABLE_BITS):
+    '''
+    Root lookup table of a Huffman tree, indexed by the next table_bits
+    bits of the stream (table_bits is cut down to the longest code):
+        (char, length) - a code of at most table_bits bits, length > 0
+        (node, 0) - a longer code: the inner node those bits lead to,
+                    the walk goes on from there bit by bit
+        None - bits that are no valid code (one symbol trees)
+    It has 2^table_bits entries whatever the alphabet size, so it is
+    built in about that many steps.
+    result:
+        table : list of 2^table_bits entries
+        table_bits : the number of bits it is indexed by
+    '''
+    depth = 0
+    for char, (code, length) in build_code_table(tree).items():
+        depth = max(depth, length)
+    table_bits = max(1, min(table_bits, depth))
+    table = [None] * (1 << table_bits)
+    pending = [(tree.root, 0, 0)] if tree.root is not None else []
+    while pending:
+        node, code, length = pending.pop()
+        if node is None:
+            continue
+        if type(node) is Huffman_Tree.Leaf_Node:
+            # Every index starting with the code holds its symbol
+            start = code << (table_bits - length)
+            span = 1 << (table_bits - length)
+            table[start:start + span] = [(node.char, length)] * span
+        elif length == table_bits:
+            table[code] = (node, 0)
+        else:
+            pending.append((node.left, code << 1, length + 1))
+            pending.append((node.right, (code << 1) | 1, length + 1))
+    return table, table_bits
+
+
+class Root_Table_Decoder:
+    '''
+    Table-driven decoder: looks the next table_bits bits of the stream
+    up in the build_root_table() root table, which gives the symbol
+    and its code length at once. Codes longer than table_bits (rare
+    symbols) go on with the tree walk from where the table leaves them.
+    The bits not decoded yet are kept in an int between calls, so a
+    stream can be decoded in pieces of any size.
+    Interface:
+        .decode(data) - Decodes whole bytes, returns the symbols decoded
+                        so far (the last bits may wait for more).
+        .finish(last_byte, bits) - Decodes the first bits of a last
+                                   partial byte (none by default) and
+                                   the bits still waiting.
+    Both raise ValueError on bits that are no valid code, finish() also
+    on a last code cut short.
+    '''
+
+    def __init__(self, tree, table_bits=DECODE_TABLE_BITS):
+        self.tree = tree
+        self.table, self.table_bits = build_root_table(tree, table_bits)
+        self.pending = 0 # Bits not decoded yet...
+        self.pending_bits = 0 # ...and how many
+
+    def decode(self, data):
+        table, table_bits = self.table, self.table_bits
+        mask = (1 << table_bits) - 1
+        leaf_type = Huffman_Tree.Leaf_Node
+        decoded_chars = []
+        append = decoded_chars.append
+        pending, pending_bits = self.pending, self.pending_bits
+        try:
+            for byte in data:
+                pending = (pending << 8) | byte
+                pending_bits += 8
+                while pending_bits >= table_bits:
+                    char, length = table[(pending >> (pending_bits - table_bits)) & mask]
+                    if length:
+                        append(char)
+                        pending_bits -= length
+                        continue
+                    # Longer code: walks on from the node reached
+                    node, position = char, pending_bits - table_bits
+                    while type(node) is not leaf_type and position:
+                        position -= 1
+                        node = node.right if (pending >> position) & 1 else node.left
+                    if type(node) is not leaf_type: # Needs more bits
+                        break
+                    append(node.char)
+                    pending_bits = position
+                pending &= (1 << pending_bits) - 1
+        except (TypeError, AttributeError): # A None entry or child
+            raise ValueError("Invalid Huffman code in the encoded data")
+        self.pending, self.pending_bits = pending, pending_bits
+        return "".join(decoded_chars)
+
+    def finish(self, last_byte=0, bits=0):
+        pending = (self.pending << bits) | (last_byte >> (8 - bits))
+        pending_bits = self.pending_bits + bits
+        self.pending, self.pending_bits = 0, 0
+        # Few bits left: the plain tree walk
+        return walk_bits(self.tree, pending, pending_bits)
+
+
+def new_decoder(tree, bit_length):
+    '''
+    Decoder for a payload of bit_length bits: the Table_Decoder byte
+    automaton when the payload is long enough to pay for its 256
+    entries per inner node (AUTOMATON_BYTES_PER_STATE payload bytes per
+    inner node), otherwise the Root_Table_Decoder, whose table size does
+    not depend on the alphabet and shrinks with the payload.
+    '''
+    inner_nodes = max(0, len(build_code_table(tree)) - 1)
+    if (inner_nodes <= AUTOMATON_MAX_STATES and
+            inner_nodes * AUTOMATON_BYTES_PER_STATE <= bit_length >> 3):
+        return Table_Decoder(tree)
+    # A short payload gets a smaller root table: about one entry per 16
+    # bits, so building it never costs more than the walk it saves
+    table_bits = min(DECODE_TABLE_BITS, max(1, (bit_length >> 4).bit_length()))
+    return Root_Table_Decoder(tree, table_bits)
+
+
+def table_decoding(encoded_data, tree):
+    '''
+    Decodes a whole Bit_Stream with the decoder new_decoder() picks.
+    params:
+        encoded_data : Bit_Stream
+        tree : Huffman_Tree class object
+    result:
+        decoded_data : original data string
+    '''
+
+    if tree.root is None: return ""
+    if encoded_data.bit_length <= TREE_WALK_MAX_BITS: # No table pays off
+        bits = int.from_bytes(encoded_data.data, "big") >> encoded_data.padding()
+        return walk_bits(tree, bits, encoded_data.bit_length)
+    decoder = new_decoder(tree, encoded_data.bit_length)
+    full_bytes = encoded_data.bit_length >> 3
+    decoded_data = decoder.decode(encoded_data.data[:full_bytes])
+    # The bits of the last byte that are not padding
+    tail_bits = encoded_data.bit_length & 7
+    if tail_bits:
+        return decoded_data + decoder.finish(encoded_data.data[full_bytes], tail_bits)
+    return decoded_data + decoder.finish()
+
+
+def huffman_decoding(encoded_data, tree):
+    '''
+    Huffman decoder that extracts from encoded data the
+    original string sequence based on a given Huffman Tree.
+    params:     
+        encoded_data : Bit_Stream returned by huffman_encoding(), or a
+                       bit-like '0'/'1' string (the former format)
+        tree : Huffman_Tree class object
+    result:
+        decoded_data : original data string (bytes for a byte_symbols tree)
+    '''
 
+    if isinstance(encoded_data, Bit_Stream):
+        decoded_data = table_decoding(encoded_data, tree)
+    else:
+        decoded_data = tree_decoding((0 if bit == '0' else 1 for bit in encoded_data), tree)
+    if tree.byte_symbols:
+        return decoded_data.encode("latin-1")
     return decoded_data
 
 
@@ -236,14 +819,12 @@ if __name__ == "__main__":
             print ("The content of the data:\n\'{}\'".format(original_data))
 
         encoded_data, tree = huffman_encoding(original_data)
-        if len(encoded_data) != 0:
-            print ("The size of the encoded data: {} bytes".format(sys.getsizeof(int(encoded_data, base=2))))
-        else:
-            print ("The size of the encoded data: 0 bytes")
+        print ("The size of the encoded data: {} bytes ({} bits + {} padding bits)".format(
+            len(encoded_data.data), encoded_data.bit_length, encoded_data.padding()))
         if limit:
-            print ("The content of the encoded data:\n\'{} ... \'".format(encoded_data[:limit]))
+            print ("The content of the encoded data:\n\'{} ... \'".format(encoded_data.to_bits()[:limit]))
         else:
-            print ("The content of the encoded data:\n\'{}\'".format(encoded_data))
+            print ("The content of the encoded data:\n\'{}\'".format(encoded_data.to_bits()))
 
         decoded_data = huffman_decoding(encoded_data, tree)
         if limit:
@@ -274,3 +855,21 @@ if __name__ == "__main__":
     f = open("problem_3.py", "r")
     file_content = f.read()
     evaluate("# Test Case 5: A real file. In fact 'this script file'", file_content, 400)
+
+    # Test Case 6: Bytes input, decoded back to bytes
+    some_bytes = b"\x00\x01\x02\x03\xff" * 8 + b"The bird is the word"
+    evaluate("# Test Case 6: Bytes input", some_bytes)
+
+    # Test Case 7: Min_Heap ties and the two-queue build of sorted frequencies
+    print("# Test Case 7: Min_Heap ties and sorted frequencies")
+    priority_queue = Min_Heap([("b", 2), ("a", 1), ("c", 2), ("d", 2)])
+    print(priority_queue.pushpop("e", 0), [priority_queue.pop() for _ in range(4)])
+    # Expected to see ('e', 0) [('a', 1), ('b', 2), ('c', 2), ('d', 2)]:
+    # equal frequencies come out in insertion order.
+    char_frequency = {"T": 1, "b": 1, "o": 1, "w": 1, "h": 2, "i": 2, "r": 2, "s": 1,
+                      "t": 1, "d": 2, "e": 2, " ": 4}
+    sorted_frequencies = sorted(char_frequency.items(), key=lambda item: item[1])
+    for tree in (build_huffman_tree(char_frequency), build_huffman_tree_sorted(sorted_frequencies)):
+        print(sum(char_frequency[char] * length
+                  for char, (code, length) in build_code_table(tree).items()))
+    # Expected to see 70 twice: both builds give optimal codes.